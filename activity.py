@@ -0,0 +1,138 @@
+"""Learner and cohort activity, pre-aggregated into daily and weekly buckets.
+
+Each event adds to one daily and one weekly bucket as it happens, so charts read a
+handful of buckets instead of scanning completion history. Buckets are plain dicts
+keyed by ISO date (weeks by their Monday), which keeps them JSON-serializable inside
+user progress and easy to mirror in the shared store.
+"""
+from datetime import date, datetime, timedelta
+import math
+
+METRICS = ('lessons', 'quiz_sum', 'quiz_count', 'certificates', 'certificate_days')
+GRANULARITIES = ('daily', 'weekly')
+
+
+def bucket_keys(when):
+    """Daily and weekly bucket keys for a datetime"""
+    day = when.date()
+    return {'daily': day.isoformat(), 'weekly': (day - timedelta(days=day.weekday())).isoformat()}
+
+
+def new_activity():
+    return {'daily': {}, 'weekly': {}, 'course_started': {}, 'time_to_certificate': {}}
+
+
+def add_to_buckets(buckets_by_granularity, when, amounts):
+    """Add metric amounts to the daily and weekly buckets containing when"""
+    for granularity, key in bucket_keys(when).items():
+        bucket = buckets_by_granularity[granularity].get(key)
+        if bucket is None:
+            bucket = buckets_by_granularity[granularity][key] = dict.fromkeys(METRICS, 0)
+        for metric, amount in amounts.items():
+            bucket[metric] += amount
+
+
+def record_lesson(activity, course_id, when):
+    """Record a lesson completion; returns the amounts added"""
+    activity['course_started'].setdefault(course_id, when.isoformat(timespec='seconds'))
+    amounts = {'lessons': 1}
+    add_to_buckets(activity, when, amounts)
+    return amounts
+
+
+def record_quiz(activity, score, when):
+    """Record a quiz or final exam attempt; returns the amounts added"""
+    amounts = {'quiz_sum': score, 'quiz_count': 1}
+    add_to_buckets(activity, when, amounts)
+    return amounts
+
+
+def record_certificate(activity, course_id, when):
+    """Record a certificate award and the days since the course's first completed lesson"""
+    started = activity['course_started'].get(course_id)
+    days = (when - datetime.fromisoformat(started)).total_seconds() / 86400 if started else 0
+    activity['time_to_certificate'][course_id] = round(days, 2)
+    amounts = {'certificates': 1, 'certificate_days': days}
+    add_to_buckets(activity, when, amounts)
+    return amounts
+
+
+def learner_activity(user_progress):
+    """The learner's activity buckets, backfilled once from history recorded before buckets existed"""
+    activity = user_progress.get('activity')
+    if activity is None:
+        activity = user_progress['activity'] = new_activity()
+        for lesson in user_progress.get('completed_lessons', []):
+            if lesson.get('completed_at'):
+                record_lesson(activity, lesson['course'], datetime.strptime(lesson['completed_at'], "%Y-%m-%d %H:%M:%S"))
+        for cert in user_progress.get('certificates', []):
+            if cert.get('awarded_at'):
+                record_certificate(activity, cert['course_id'], datetime.fromisoformat(cert['awarded_at']))
+    return activity
+
+
+def merge_activity(first, second):
+    """Combine two sessions' copies of one learner's activity.
+
+    Both copies usually share most events, so buckets take the larger value of each
+    metric rather than the sum: nothing is counted twice, and the merge can be
+    repeated safely.
+    """
+    merged = new_activity()
+    for granularity in GRANULARITIES:
+        for source in (first, second):
+            for key, bucket in source[granularity].items():
+                target = merged[granularity].setdefault(key, dict.fromkeys(METRICS, 0))
+                for metric in METRICS:
+                    target[metric] = max(target[metric], bucket.get(metric, 0))
+    for source in (first, second):
+        for course_id, started in source['course_started'].items():
+            merged['course_started'][course_id] = min(started, merged['course_started'].get(course_id, started))
+        for course_id, days in source['time_to_certificate'].items():
+            merged['time_to_certificate'].setdefault(course_id, days)
+    return merged
+
+
+def _merge(period, buckets):
+    merged = dict.fromkeys(METRICS, 0)
+    for bucket in buckets:
+        for metric in METRICS:
+            merged[metric] += bucket[metric]
+    merged['period'] = period
+    return merged
+
+
+def activity_series(buckets_by_granularity, max_points=60):
+    """Chart rows at the finest granularity that fits in max_points.
+
+    Uses daily buckets for short ranges and weekly ones for longer ranges, merging
+    weeks into fixed windows of step weeks counted from the first week when even
+    those would exceed max_points, so a window always covers the same calendar
+    weeks however sparse the buckets are. Each row has the bucket metrics plus
+    'period' (the window's first day), 'avg_quiz_score' and 'avg_days_to_certificate'.
+    """
+    daily = buckets_by_granularity['daily']
+    if not daily:
+        return [], 'daily'
+    first, last = min(daily), max(daily)
+    span = (date.fromisoformat(last) - date.fromisoformat(first)).days + 1
+    if span <= max_points:
+        granularity, step = 'daily', 1
+        windows = {key: [key] for key in sorted(daily)}
+    else:
+        granularity = 'weekly'
+        weekly = buckets_by_granularity['weekly']
+        first_week = date.fromisoformat(min(weekly))
+        weeks = (date.fromisoformat(max(weekly)) - first_week).days // 7 + 1
+        step = math.ceil(weeks / max_points)
+        windows = {}
+        for key in sorted(weekly):
+            window = (date.fromisoformat(key) - first_week).days // 7 // step
+            windows.setdefault((first_week + timedelta(weeks=window * step)).isoformat(), []).append(key)
+    rows = [
+        _merge(period, [buckets_by_granularity[granularity][key] for key in keys]) for period, keys in windows.items()
+    ]
+    for row in rows:
+        row['avg_quiz_score'] = row['quiz_sum'] / row['quiz_count'] if row['quiz_count'] else None
+        row['avg_days_to_certificate'] = row['certificate_days'] / row['certificates'] if row['certificates'] else None
+    return rows, granularity if step == 1 else f"{step}-week"
@@ -0,0 +1,311 @@
+"""Benchmarks for the platform core, certificate rendering and the shared store.
+
+    python benchmarks.py core --save baseline.json     # core timings on synthetic catalogs and learners
+    python benchmarks.py compare baseline.json new.json  # flag regressions between two saved runs
+    python benchmarks.py certificates                  # per-template render timings (ms per call)
+    python benchmarks.py shared-store -p 1 2 4 8       # request throughput by process count
+"""
+import argparse
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from platform import machine, python_version
+
+from certificates import CertificateGenerator
+from course_catalog import compile_catalog
+from shared_store import CatalogCache, SharedStore
+
+CATALOG_SIZES = [10, 100, 1000, 5000]
+COMPLETION_COUNTS = [0, 100, 1000, 10000, 50000]
+
+SAMPLE_CERTIFICATE = ("Finance Learner", "📊 Budgeting Basics", "January 01, 2025", 92.5)
+# Name and course title too long for the default sizes, so text fitting kicks in
+LONG_CERTIFICATE = (
+    "Maximilian Alexander Bartholomew Fitzgerald-Worthington III",
+    "Advanced Retirement Planning, Tax-Advantaged Accounts and Estate Strategy",
+    "January 01, 2025",
+    92.5
+)
+
+
+def time_call(func, iterations):
+    """Average wall time of func() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def bench_certificate_templates(iterations=200):
+    """Compile and render timings for every certificate template"""
+    results = {}
+    for name in CertificateGenerator().certificate_templates:
+        # A fresh generator so compile time includes font loading
+        generator = CertificateGenerator()
+        start = time.perf_counter()
+        generator.render_plan(name)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        image = generator.generate_certificate_image(*SAMPLE_CERTIFICATE, template=name)
+        results[name] = {
+            'compile_ms': compile_ms,
+            'png_render_ms': time_call(lambda: generator.generate_certificate_image(*SAMPLE_CERTIFICATE, template=name), iterations),
+            'png_fit_ms': time_call(lambda: generator.generate_certificate_image(*LONG_CERTIFICATE, template=name), iterations),
+            'png_encode_ms': time_call(lambda: image.save(io.BytesIO(), format="PNG"), max(1, iterations // 10)),
+            'pdf_render_ms': time_call(lambda: generator.generate_certificate_pdf(*SAMPLE_CERTIFICATE, template=name), iterations),
+            'pdf_fit_ms': time_call(lambda: generator.generate_certificate_pdf(*LONG_CERTIFICATE, template=name), iterations),
+        }
+    return results
+
+
+def _shared_store_worker(path, learners, write_ratio, start_at, duration):
+    """Simulate app reruns against the shared store; returns the number completed"""
+    store = SharedStore(path)
+    catalog_cache = CatalogCache(store, "bench")
+    rng = random.Random(os.getpid())
+    while time.time() < start_at:
+        time.sleep(0.001)
+    requests = 0
+    end = start_at + duration
+    while time.time() < end:
+        # One rerun: catalog version check, progress load, certificate lookup and,
+        # for reruns that changed something, a progress save
+        learner_id = f"learner-{rng.randrange(learners)}"
+        catalog_cache.get()
+        progress = store.load_progress(learner_id)
+        store.get_certificate("bench", f"cert-{learner_id}")
+        if rng.random() < write_ratio:
+            progress['quiz_scores'][f"course_{rng.randrange(10)}"] = rng.random() * 100
+            store.save_progress(learner_id, progress)
+        requests += 1
+    return requests
+
+
+def bench_shared_store_scaling(process_counts=(1, 2, 4, 8), duration=3.0, learners=1000, write_ratio=0.2):
+    """Requests per second through one SQLite store for each process count"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "shared.db")
+        store = SharedStore(path)
+        store.publish_catalog("bench", {f"course_{i}": {'lessons': [{'id': j} for j in range(20)]} for i in range(10)})
+        for i in range(learners):
+            store.save_progress(f"learner-{i}", {'completed_lessons': [], 'quiz_scores': {}})
+            store.put_certificate("bench", f"cert-learner-{i}", os.urandom(30000))
+
+        for processes in process_counts:
+            start_at = time.time() + 0.5
+            with multiprocessing.Pool(processes) as pool:
+                counts = pool.starmap(
+                    _shared_store_worker,
+                    [(path, learners, write_ratio, start_at, duration)] * processes
+                )
+            results[processes] = sum(counts) / duration
+    return results
+
+
+def synthetic_catalog(lessons, lessons_per_course=50):
+    """A valid compiled catalog with the given number of lessons"""
+    def question(index):
+        return {'question': f"Question {index}", 'options': ['A', 'B', 'C', 'D'], 'correct': index % 4}
+
+    courses = {}
+    for number, start in enumerate(range(0, lessons, lessons_per_course)):
+        courses[f"course_{number}"] = {
+            'title': f"Course {number}",
+            'description': "Synthetic course",
+            'level': 'Beginner',
+            'duration': '1 hour',
+            'certificate_threshold': 70,
+            'lessons': [
+                {
+                    'id': lesson_id,
+                    'title': f"Lesson {lesson_id}",
+                    'content': "",
+                    'video_id': "",
+                    'video_title': "",
+                    'duration': '5:00',
+                    'quiz': {'questions': [question(i) for i in range(3)]}
+                }
+                for lesson_id in range(1, min(lessons_per_course, lessons - start) + 1)
+            ],
+            'final_quiz': {'title': f"Course {number} Final Exam", 'questions': [question(i) for i in range(10)]}
+        }
+    return compile_catalog(courses)
+
+
+def synthetic_progress(catalog, completions):
+    """Learner progress with the given number of completions, cycling through the catalog's lessons"""
+    lessons = [(course_id, lesson['id']) for course_id, course in catalog.courses.items() for lesson in course['lessons']]
+    progress = {
+        'completed_lessons': [],
+        'quiz_scores': {},
+        'final_quiz_scores': {},
+        'achievements': [],
+        'certificates': [],
+        'watched_videos': []
+    }
+    for i in range(completions):
+        course_id, lesson_id = lessons[i % len(lessons)]
+        progress['completed_lessons'].append({'course': course_id, 'id': lesson_id, 'completed_at': "2025-01-01 12:00:00"})
+        progress['quiz_scores'][f"{course_id}_{lesson_id}"] = 80.0
+    return progress
+
+
+def measure(func, min_time=0.02, repeat=3):
+    """Best-of-repeat time per call of func() in microseconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / loops
+
+
+def bench_core(catalog_sizes=CATALOG_SIZES, completion_counts=COMPLETION_COUNTS, min_time=0.02):
+    """Time the platform's learner operations over synthetic catalogs and learners.
+
+    Returns {"name[lessons=N,completions=M]": microseconds per call}.
+    """
+    # Imported here so the other benchmarks don't need Streamlit
+    from learning_platform import FinanceLearningPlatform
+
+    generator = CertificateGenerator()
+    results = {}
+    for lessons in catalog_sizes:
+        catalog = synthetic_catalog(lessons)
+        platform = FinanceLearningPlatform(generator, catalog)
+        course_id = list(catalog.courses)[-1]
+        final_questions = catalog.courses[course_id]['final_quiz']['questions']
+        answers = [question['correct'] for question in final_questions]
+
+        for completions in completion_counts:
+            progress = synthetic_progress(catalog, completions)
+
+            def mark_and_undo():
+                # A lesson id that is never completed, so every call scans and appends
+                platform.mark_lesson_completed(course_id, -1, progress)
+                progress['completed_lessons'].pop()
+
+            def award_and_undo():
+                platform.award_certificate(course_id, progress, "Finance Learner", 100)
+                progress['certificates'].pop()
+
+            cases = {
+                'calculate_progress': lambda: platform.calculate_progress(progress['completed_lessons']),
+                'is_lesson_completed': lambda: platform.is_lesson_completed(course_id, -1, progress),
+                'is_course_completed': lambda: platform.is_course_completed(course_id, progress),
+                'calculate_course_score': lambda: platform.calculate_course_score(course_id, progress),
+                'mark_lesson_completed': mark_and_undo,
+                'award_certificate': award_and_undo,
+                'grade_quiz': lambda: platform.grade_quiz(final_questions, answers),
+            }
+            for name, func in cases.items():
+                results[f"{name}[lessons={lessons},completions={completions}]"] = measure(func, min_time)
+
+    results["render_certificate_png"] = measure(lambda: generator.generate_certificate_image(*SAMPLE_CERTIFICATE), min_time)
+    results["render_certificate_pdf"] = measure(lambda: generator.generate_certificate_pdf(*SAMPLE_CERTIFICATE), min_time)
+    return results
+
+
+def save_results(results, path):
+    """Write benchmark results as a JSON baseline"""
+    with open(path, 'w') as f:
+        json.dump({
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': python_version(),
+            'machine': machine(),
+            'unit': 'us',
+            'results': results
+        }, f, indent=2, sort_keys=True)
+
+
+def compare_results(baseline, current, tolerance=0.25, min_delta_us=1.0):
+    """Benchmarks slower than the baseline by more than tolerance (and min_delta_us)
+
+    Returns a list of (name, baseline_us, current_us) sorted by slowdown.
+    """
+    regressions = []
+    for name, before in baseline.items():
+        after = current.get(name)
+        if after is None:
+            continue
+        if after > before * (1 + tolerance) and after - before > min_delta_us:
+            regressions.append((name, before, after))
+    return sorted(regressions, key=lambda item: item[2] / item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command")
+    core = subparsers.add_parser("core", help="platform core timings on synthetic data")
+    core.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    core.add_argument("--quick", action="store_true", help="shorter timing runs, for smoke tests")
+    compare = subparsers.add_parser("compare", help="compare two saved runs and flag regressions")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio (default: %(default)s)")
+    compare.add_argument("--min-delta-us", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    certificates = subparsers.add_parser("certificates", help="certificate template render timings")
+    certificates.add_argument("--iterations", type=int, default=200)
+    shared = subparsers.add_parser("shared-store", help="shared store throughput by process count")
+    shared.add_argument("-p", "--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    shared.add_argument("--duration", type=float, default=3.0)
+    shared.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "core":
+        results = bench_core(min_time=0.005 if args.quick else 0.02)
+        for name, micros in results.items():
+            print(f"{name:<70}{micros:>14.2f} us")
+        if args.save:
+            save_results(results, args.save)
+        return 0
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        with open(args.current) as f:
+            current = json.load(f)['results']
+        regressions = compare_results(baseline, current, args.tolerance, args.min_delta_us)
+        missing = sorted(set(baseline) - set(current))
+        for name in missing:
+            print(f"missing: {name}")
+        for name, before, after in regressions:
+            print(f"REGRESSION {name:<70}{before:>12.2f} -> {after:>12.2f} us ({after / before:.2f}x)")
+        print(f"{len(regressions)} regression(s) in {len(set(baseline) & set(current))} benchmarks")
+        return 1 if regressions else 0
+
+    if args.command == "shared-store":
+        results = bench_shared_store_scaling(args.processes, args.duration, write_ratio=args.write_ratio)
+        baseline = results[args.processes[0]] / args.processes[0]
+        print(f"{'processes':<12}{'requests/s':>14}{'speedup':>10}")
+        for processes, throughput in results.items():
+            print(f"{processes:<12}{throughput:>14.0f}{throughput / baseline:>10.2f}")
+        return 0
+
+    results = bench_certificate_templates(getattr(args, 'iterations', 200))
+    columns = ['compile_ms', 'png_render_ms', 'png_fit_ms', 'png_encode_ms', 'pdf_render_ms', 'pdf_fit_ms']
+    print(f"{'template':<12}" + "".join(f"{column:>16}" for column in columns))
+    for name, timings in results.items():
+        print(f"{name:<12}" + "".join(f"{timings[column]:>16.3f}" for column in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,704 @@
+from PIL import Image, ImageDraw, ImageFont
+import io
+import base64
+import re
+import string
+import unicodedata
+import zlib
+
+# Advance widths (1/1000 em) for the standard PDF Type1 fonts, characters 32-126.
+# Standard fonts are not embedded, which keeps certificate PDFs a few KB each.
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+]
+PDF_DEFAULT_WIDTH = 556  # Used for Latin-1 characters outside the table
+PDF_ASCENT = 0.718       # Helvetica ascender, used to place text by its top edge like PIL
+
+
+def pdf_text_width(data, size, bold=False):
+    """Width in points of WinAnsi-encoded text set in Helvetica"""
+    advance = _pdf_advance(bold)
+    return sum(advance(c) for c in data) * size / 1000
+
+
+def _pdf_advance(bold):
+    """Advance function for a Helvetica variant, in 1/1000 em per WinAnsi byte"""
+    widths = HELVETICA_BOLD_WIDTHS if bold else HELVETICA_WIDTHS
+    return lambda c: widths[c - 32] if 32 <= c <= 126 else PDF_DEFAULT_WIDTH
+
+
+PDF_RASTER_SCALE = 4      # Stencil pixels per point for text the standard fonts cannot show
+
+
+def encode_pdf_text(text):
+    """Encode text for a WinAnsi font, dropping characters it cannot show (e.g. emoji)"""
+    return unicodedata.normalize('NFC', text).encode('cp1252', errors='ignore').strip()
+
+
+def pdf_can_encode(text):
+    """Whether encode_pdf_text loses nothing but symbols such as emoji.
+
+    Letters, digits and punctuation outside WinAnsi (e.g. "Ł", "ễ" or "王") would
+    silently disappear, so such text has to be drawn another way.
+    """
+    text = unicodedata.normalize('NFC', text)
+    try:
+        text.encode('cp1252')
+        return True
+    except UnicodeEncodeError:
+        pass
+    for char in text:
+        try:
+            char.encode('cp1252')
+        except UnicodeEncodeError:
+            # Symbols (emoji), format characters (zero-width joiners) and variation selectors may go
+            if unicodedata.category(char)[0] not in 'SC' and not '\ufe00' <= char <= '\ufe0f':
+                return False
+    return True
+
+
+def _pdf_string(data):
+    """Escape encoded text as a PDF literal string"""
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _pdf_color(rgb):
+    """Format an RGB tuple (0-255) as PDF color operands"""
+    return " ".join(f"{c / 255:.3f}" for c in rgb).encode()
+
+
+def pdf_text_ops(data, x, baseline, size, bold=False, fill=b"0 0 0"):
+    """PDF operators drawing encoded text in Helvetica; fill is an RGB tuple or preformatted operands"""
+    if not isinstance(fill, bytes):
+        fill = _pdf_color(fill)
+    return (
+        b"BT /%s %d Tf " % (b"F2" if bold else b"F1", size) + fill +
+        b" rg %.2f %.2f Td " % (x, baseline) + _pdf_string(data) + b" Tj ET"
+    )
+
+
+def text_stencil(text, font):
+    """text drawn with a PIL font as a 1-bit stencil (0 where inked) and its bbox relative to the text origin"""
+    bbox = font.getbbox(text)
+    image = Image.new('L', (max(1, bbox[2] - bbox[0]), max(1, bbox[3] - bbox[1])), 0)
+    ImageDraw.Draw(image).text((-bbox[0], -bbox[1]), text, fill=255, font=font)
+    return image.point(lambda v: 0 if v >= 128 else 255, '1'), bbox
+
+
+def pdf_stencil_ops(text, font, x, top, fill=b"0 0 0", scale=PDF_RASTER_SCALE):
+    """PDF operators painting text in the fill color through an inline stencil mask.
+
+    font is a PIL font at scale times the point size; (x, top) is where PIL's text
+    origin (the top of the ascent) lands on the page.
+    """
+    if not isinstance(fill, bytes):
+        fill = _pdf_color(fill)
+    mask, bbox = text_stencil(text, font)
+    # ASCIIHex keeps the compressed data from containing a stray "EI" that would end the image early
+    data = zlib.compress(mask.tobytes()).hex().encode()
+    return (
+        fill + b" rg q %.2f 0 0 %.2f %.2f %.2f cm " % (
+            mask.width / scale, mask.height / scale, x + bbox[0] / scale, top - bbox[3] / scale
+        ) +
+        b"BI /W %d /H %d /IM true /BPC 1 /F [/AHx /Fl] ID\n" % (mask.width, mask.height) + data + b">\nEI Q"
+    )
+
+
+class PDFWriter:
+    """Minimal streaming PDF writer: pages are written as soon as they are added"""
+
+    CATALOG_ID, PAGES_ID, REGULAR_FONT_ID, BOLD_FONT_ID = 1, 2, 3, 4
+
+    def __init__(self, stream, width, height):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.image_ids = {}
+        self.next_id = 5
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(self.REGULAR_FONT_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        self._write_object(self.BOLD_FONT_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def _write_object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        self._write(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    def _allocate(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _image_object(self, image, color_space, smask_id=None):
+        object_id = self._allocate()
+        compressed = zlib.compress(image.tobytes())
+        smask = b" /SMask %d 0 R" % smask_id if smask_id else b""
+        self._write_object(
+            object_id,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /%s /BitsPerComponent 8"
+            b" /Filter /FlateDecode /Length %d%s >>\nstream\n" % (image.width, image.height, color_space, len(compressed), smask)
+            + compressed + b"\nendstream"
+        )
+        return object_id
+
+    def add_image(self, name, image):
+        """Embed a PIL image once per document under the resource name given"""
+        if name in self.image_ids:
+            return
+        smask_id = None
+        if image.mode == 'RGBA':
+            smask_id = self._image_object(image.getchannel('A'), b"DeviceGray")
+        self.image_ids[name] = self._image_object(image.convert('RGB'), b"DeviceRGB", smask_id)
+
+    def add_page(self, content, width=None, height=None):
+        """Write one page whose drawing operators are given in content"""
+        compressed = zlib.compress(content)
+        content_id = self._allocate()
+        self._write_object(
+            content_id,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(compressed) + compressed + b"\nendstream"
+        )
+        page_id = self._allocate()
+        xobjects = b"".join(b"/%s %d 0 R " % (name, object_id) for name, object_id in self.image_ids.items())
+        self._write_object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> /XObject << %s>> >> >>"
+            % (self.PAGES_ID, width or self.width, height or self.height, content_id, self.REGULAR_FONT_ID, self.BOLD_FONT_ID, xobjects)
+        )
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """Write the page tree, cross-reference table and trailer"""
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        self._write_object(self.PAGES_ID, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self.page_ids))
+        self._write_object(self.CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES_ID)
+        xref_position = self.position
+        xref = [b"xref\n0 %d\n" % self.next_id, b"0000000000 65535 f \n"]
+        for object_id in range(1, self.next_id):
+            xref.append(b"%010d 00000 n \n" % self.offsets[object_id])
+        self._write(b"".join(xref))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.next_id, self.CATALOG_ID, xref_position))
+
+
+
+class GlyphMetrics:
+    """Glyph advances of one font, measured once per character at a reference size.
+
+    Advances scale linearly with font size, so the largest size at which a text
+    fits a width follows directly from the summed advances, with no re-measuring.
+    """
+
+    def __init__(self, measure, reference_size):
+        self.measure = measure
+        self.reference_size = reference_size
+        self.advances = {}
+
+    def units(self, text):
+        """Summed advance of text at the reference size"""
+        advances = self.advances
+        total = 0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = self.measure(char)
+            total += advance
+        return total
+
+    def truncate(self, text, max_width, size, ellipsis):
+        """text cut short and ended with ellipsis so it fits max_width at size (str or encoded bytes)"""
+        limit = max_width * self.reference_size / size - self.units(ellipsis)
+        total = 0
+        for end in range(len(text)):
+            total += self.units(text[end:end + 1])
+            if total > limit:
+                return text[:end].rstrip() + ellipsis
+        return text
+
+    def fit_size(self, text, max_width, max_size, min_size):
+        """Largest size between min_size and max_size at which text fits max_width"""
+        units = self.units(text)
+        if units <= 0:
+            return max_size
+        return max(min_size, min(max_size, int(max_width * self.reference_size / units)))
+
+
+class RenderStep:
+    """One text element of a compiled template"""
+
+    __slots__ = (
+        'text', 'requires', 'font', 'bold', 'size', 'x', 'y', 'align', 'fill', 'pdf_fill', 'page_height', 'is_static',
+        'max_width', 'min_size', 'font_for_size', 'metrics', 'pdf_metrics'
+    )
+
+    def __init__(self, element, font, bold, size, fill, canvas_width, canvas_height, font_for_size=None, metrics=None, pdf_metrics=None):
+        self.text = element['text']
+        self.requires = element.get('requires')
+        self.font = font
+        self.bold = bold
+        self.size = size
+        # Text longer than max_width is set in a smaller size, down to min_size
+        self.max_width = element.get('max_width')
+        self.min_size = element.get('min_size', size // 2)
+        self.font_for_size = font_for_size
+        self.metrics = metrics
+        self.pdf_metrics = pdf_metrics
+        self.align = element.get('align', 'center')
+        self.x = element.get('x', canvas_width // 2 if self.align == 'center' else 0)
+        self.y = element['y']
+        self.fill = fill
+        self.pdf_fill = _pdf_color(fill)
+        self.page_height = canvas_height
+        self.is_static = not any(field for _, field, _, _ in string.Formatter().parse(self.text))
+
+    def format(self, fields):
+        """The text to draw for these certificate fields, or None if the step is skipped"""
+        if self.requires and not fields.get(self.requires):
+            return None
+        return self.text.format(**fields)
+
+    def left(self, text_width):
+        """Left edge of text of the given width under this step's alignment"""
+        if self.align == 'center':
+            return (2 * self.x - text_width) // 2
+        if self.align == 'right':
+            return self.x - text_width
+        return self.x
+
+    def layout(self, text):
+        """(text, font, size, bbox) for drawing text fitted to max_width"""
+        font, size = self.font, self.size
+        if self.max_width and self.metrics:
+            size = self.metrics.fit_size(text, self.max_width, self.size, self.min_size)
+            if size != self.size:
+                font = self.font_for_size(size)
+        bbox = font.getbbox(text)
+        # Hinting and kerning can leave the scaled estimate a pixel or two off
+        while self.max_width and self.metrics and bbox[2] - bbox[0] > self.max_width and size > self.min_size:
+            size -= 1
+            font = self.font_for_size(size)
+            bbox = font.getbbox(text)
+        if self.max_width and self.metrics and bbox[2] - bbox[0] > self.max_width:
+            # Too wide even at min_size: cut the text short rather than overflow the canvas
+            text = self.metrics.truncate(text, self.max_width, size, "…")
+            bbox = font.getbbox(text)
+            while bbox[2] - bbox[0] > self.max_width and len(text) > 1:
+                text = text[:-2].rstrip() + "…"
+                bbox = font.getbbox(text)
+        return text, font, size, bbox
+
+    def draw(self, draw, text):
+        """Draw the text onto a PIL image"""
+        text, font, size, bbox = self.layout(text)
+        # A shrunk line stays vertically centered on the line it was laid out for
+        draw.text((self.left(bbox[2] - bbox[0]), self.y + (self.size - size) // 2), text, fill=self.fill, font=font)
+
+    def pdf_ops(self, text):
+        """PDF operators drawing the text in Helvetica, or as a stencil of the PNG font if Helvetica can't show it"""
+        if self.metrics and not pdf_can_encode(text):
+            text, font, size, bbox = self.layout(text)
+            top = self.page_height - self.y - (self.size - size) // 2
+            return pdf_stencil_ops(
+                text, self.font_for_size(size * PDF_RASTER_SCALE), self.left(bbox[2] - bbox[0]), top, self.pdf_fill
+            )
+        data = encode_pdf_text(text)
+        size = self.size
+        if self.max_width:
+            size = self.pdf_metrics.fit_size(data, self.max_width, self.size, self.min_size)
+            if self.pdf_metrics.units(data) * size / self.pdf_metrics.reference_size > self.max_width:
+                data = self.pdf_metrics.truncate(data, self.max_width, size, b"...")
+        x = self.left(pdf_text_width(data, size, self.bold))
+        baseline = self.page_height - self.y - (self.size - size) / 2 - size * PDF_ASCENT
+        return pdf_text_ops(data, x, baseline, size, self.bold, self.pdf_fill)
+
+
+class CertificateRenderPlan:
+    """A template compiled once: fonts loaded, static layers pre-rendered, variable text left as steps"""
+
+    def __init__(self, name, width, height):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.base_image = None  # Background, images, border and static text
+        self.pdf_static = b""   # The same static layers as PDF operators
+        self.pdf_images = []    # (resource name, image) embedded once per PDF document
+        self.steps = []         # RenderSteps whose text depends on the certificate
+
+
+class CertificateGenerator:
+    default_font_files = {'regular': "arial.ttf", 'bold': "arialbd.ttf"}
+
+    def __init__(self, templates=None):
+        # Templates are plain data. Element text may use {student_name}, {course_name},
+        # {completion_date}, {score} and {organization_name}; elements without fields are static.
+        self.certificate_templates = templates or {
+            'basic': {
+                'size': (800, 600),
+                'background_color': (139, 69, 19),  # SaddleBrown
+                'colors': {
+                    'border': (255, 215, 0),        # Gold
+                    'text': (255, 255, 255),        # White
+                    'accent': (255, 215, 0)         # Gold
+                },
+                'border': {'color': 'border', 'inset': 10, 'width': 8},
+                'fonts': {
+                    'title': {'size': 40, 'bold': True},
+                    'name': {'size': 36, 'bold': True},
+                    'text': {'size': 24},
+                    'small': {'size': 18},
+                    'org': {'size': 28, 'bold': True}
+                },
+                'elements': [
+                    {'text': "{organization_name}", 'font': 'org', 'y': 40, 'color': 'text'},
+                    {'text': "CERTIFICATE OF COMPLETION", 'font': 'title', 'y': 100, 'color': 'accent'},
+                    {'text': "This certifies that", 'font': 'text', 'y': 180, 'color': 'text'},
+                    {'text': "{student_name}", 'font': 'name', 'y': 240, 'color': 'accent', 'max_width': 720},
+                    {'text': "has successfully completed the course", 'font': 'text', 'y': 310, 'color': 'text'},
+                    {'text': "{course_name}", 'font': 'name', 'y': 360, 'color': 'accent', 'max_width': 720, 'min_size': 14},
+                    {'text': "with a final exam score of {score}%", 'font': 'text', 'y': 420, 'color': 'text', 'requires': 'score'},
+                    {'text': "Completed on: {completion_date}", 'font': 'small', 'y': 480, 'color': 'text'},
+                    {'text': "{organization_name}", 'font': 'text', 'y': 530, 'color': 'accent'}
+                ]
+            },
+            'modern': {
+                'size': (800, 600),
+                'background_color': (20, 33, 61),   # Navy
+                'colors': {
+                    'text': (236, 240, 245),
+                    'accent': (0, 180, 216),        # Teal
+                    'muted': (150, 160, 180)
+                },
+                'shapes': [
+                    {'box': [0, 0, 24, 600], 'color': 'accent'},
+                    {'box': [70, 170, 270, 174], 'color': 'accent'}
+                ],
+                'fonts': {
+                    'org': {'size': 24, 'bold': True},
+                    'title': {'size': 38, 'bold': True},
+                    'name': {'size': 36, 'bold': True},
+                    'course': {'size': 28, 'bold': True},
+                    'text': {'size': 22},
+                    'small': {'size': 18}
+                },
+                'elements': [
+                    {'text': "{organization_name}", 'font': 'org', 'x': 70, 'y': 50, 'align': 'left', 'color': 'accent'},
+                    {'text': "Certificate of Completion", 'font': 'title', 'x': 70, 'y': 110, 'align': 'left', 'color': 'text'},
+                    {'text': "Awarded to", 'font': 'small', 'x': 70, 'y': 210, 'align': 'left', 'color': 'muted'},
+                    {'text': "{student_name}", 'font': 'name', 'x': 70, 'y': 240, 'align': 'left', 'color': 'accent', 'max_width': 680},
+                    {'text': "for completing", 'font': 'small', 'x': 70, 'y': 310, 'align': 'left', 'color': 'muted'},
+                    {'text': "{course_name}", 'font': 'course', 'x': 70, 'y': 340, 'align': 'left', 'color': 'text', 'max_width': 680, 'min_size': 14},
+                    {'text': "Final exam score: {score}%", 'font': 'text', 'x': 70, 'y': 410, 'align': 'left', 'color': 'text', 'requires': 'score'},
+                    {'text': "Completed {completion_date}", 'font': 'small', 'x': 70, 'y': 520, 'align': 'left', 'color': 'muted'},
+                    {'text': "{organization_name}", 'font': 'small', 'x': 740, 'y': 520, 'align': 'right', 'color': 'text'}
+                ]
+            },
+            'minimal': {
+                'size': (800, 600),
+                'background_color': (250, 250, 247),
+                'colors': {
+                    'border': (200, 190, 170),
+                    'text': (40, 40, 40),
+                    'accent': (120, 90, 30)
+                },
+                'border': {'color': 'border', 'inset': 24, 'width': 2},
+                'fonts': {
+                    'title': {'size': 32, 'bold': True},
+                    'name': {'size': 40, 'bold': True},
+                    'course': {'size': 28},
+                    'text': {'size': 20},
+                    'small': {'size': 16}
+                },
+                'elements': [
+                    {'text': "CERTIFICATE OF COMPLETION", 'font': 'title', 'y': 90, 'color': 'accent'},
+                    {'text': "{student_name}", 'font': 'name', 'y': 220, 'color': 'text', 'max_width': 680},
+                    {'text': "has successfully completed", 'font': 'text', 'y': 300, 'color': 'text'},
+                    {'text': "{course_name}", 'font': 'course', 'y': 340, 'color': 'accent', 'max_width': 680, 'min_size': 14},
+                    {'text': "Final exam score: {score}%", 'font': 'text', 'y': 400, 'color': 'text', 'requires': 'score'},
+                    {'text': "{completion_date}", 'font': 'small', 'x': 60, 'y': 520, 'align': 'left', 'color': 'text'},
+                    {'text': "{organization_name}", 'font': 'small', 'x': 740, 'y': 520, 'align': 'right', 'color': 'accent'}
+                ]
+            }
+        }
+        self._fonts = {}
+        self._metrics = {}
+        self._render_plans = {}
+
+    def _load_font(self, path, size):
+        """Load a TrueType font once per (file, size), falling back to Pillow's default font"""
+        key = (path, size)
+        if key not in self._fonts:
+            try:
+                self._fonts[key] = ImageFont.truetype(path, size)
+            except OSError:
+                try:
+                    # Pillow 10.1+ bundles a scalable default font, so fitting still works without the TTF
+                    self._fonts[key] = ImageFont.load_default(size)
+                except TypeError:
+                    self._fonts[key] = ImageFont.load_default()
+        return self._fonts[key]
+
+    def text_font(self, size, bold=False):
+        """The default certificate font at a size, e.g. for stencilled PDF text outside certificates"""
+        return self._load_font(self.default_font_files['bold' if bold else 'regular'], size)
+
+    def _glyph_metrics(self, path):
+        """Cached glyph advance table for a font, or None if it can't be scaled"""
+        if path not in self._metrics:
+            reference_font = self._load_font(path, 100)
+            scalable = isinstance(reference_font, ImageFont.FreeTypeFont)
+            self._metrics[path] = GlyphMetrics(reference_font.getlength, 100) if scalable else None
+        return self._metrics[path]
+
+    def _pdf_metrics(self, bold):
+        """Cached glyph advance table for Helvetica or Helvetica-Bold"""
+        key = ('pdf', bold)
+        if key not in self._metrics:
+            self._metrics[key] = GlyphMetrics(_pdf_advance(bold), 1000)
+        return self._metrics[key]
+
+    def _load_image(self, path, box, fill=False):
+        """Load a background or logo image sized to its box, or None if it can't be read"""
+        try:
+            image = Image.open(path).convert('RGBA')
+        except OSError:
+            return None
+        if fill:
+            return image.resize((box[2], box[3]))
+        image.thumbnail((box[2], box[3]))
+        return image
+
+    def _compile_template(self, name):
+        """Compile a template into a render plan with every static layer pre-rendered"""
+        template = self.certificate_templates[name]
+        width, height = template.get('size', (800, 600))
+        colors = template['colors']
+        font_files = template.get('font_files', self.default_font_files)
+        plan = CertificateRenderPlan(name, width, height)
+
+        base = Image.new('RGB', (width, height), color=template['background_color'])
+        draw = ImageDraw.Draw(base)
+        pdf_ops = [_pdf_color(template['background_color']) + b" rg 0 0 %d %d re f" % (width, height)]
+
+        def add_image(path, box, fill=False):
+            layer = self._load_image(path, box, fill)
+            if layer is None:
+                return
+            x = box[0] + (box[2] - layer.width) // 2
+            y = box[1] + (box[3] - layer.height) // 2
+            base.paste(layer, (x, y), layer)
+            resource = re.sub(r'[^A-Za-z0-9]', '', f"Im{name}{len(plan.pdf_images)}").encode()
+            plan.pdf_images.append((resource, layer))
+            pdf_ops.append(b"q %d 0 0 %d %d %d cm /%s Do Q" % (layer.width, layer.height, x, height - y - layer.height, resource))
+
+        if template.get('background_image'):
+            add_image(template['background_image'], (0, 0, width, height), fill=True)
+
+        for shape in template.get('shapes', []):
+            x0, y0, x1, y1 = shape['box']
+            draw.rectangle([x0, y0, x1, y1], fill=colors[shape['color']])
+            pdf_ops.append(_pdf_color(colors[shape['color']]) + b" rg %d %d %d %d re f" % (x0, height - y1 - 1, x1 - x0 + 1, y1 - y0 + 1))
+
+        border = template.get('border')
+        if border:
+            inset, line_width = border['inset'], border['width']
+            draw.rectangle([inset, inset, width - inset, height - inset], outline=colors[border['color']], width=line_width)
+            # PIL draws the outline inward from the box edge; PDF strokes are centered on the path
+            edge = inset + line_width / 2
+            pdf_ops.append(
+                _pdf_color(colors[border['color']]) +
+                b" RG %d w %.1f %.1f %.1f %.1f re S" % (line_width, edge, edge, width - 2 * edge, height - 2 * edge)
+            )
+
+        logo = template.get('logo')
+        if logo:
+            add_image(logo['path'], logo['box'])
+
+        for element in template['elements']:
+            font_spec = template['fonts'][element['font']]
+            bold = font_spec.get('bold', False)
+            font_path = font_files['bold' if bold else 'regular']
+            font = self._load_font(font_path, font_spec['size'])
+            step = RenderStep(
+                element, font, bold, font_spec['size'], colors[element['color']], width, height,
+                font_for_size=lambda size, font_path=font_path: self._load_font(font_path, size),
+                metrics=self._glyph_metrics(font_path),
+                pdf_metrics=self._pdf_metrics(bold)
+            )
+            if step.is_static:
+                step.draw(draw, step.text)
+                pdf_ops.append(step.pdf_ops(step.text))
+            else:
+                plan.steps.append(step)
+
+        plan.base_image = base
+        plan.pdf_static = b"\n".join(pdf_ops)
+        return plan
+
+    def render_plan(self, template='basic'):
+        """The compiled render plan for a template, compiled on first use"""
+        plan = self._render_plans.get(template)
+        if plan is None:
+            plan = self._render_plans[template] = self._compile_template(template)
+        return plan
+
+    def compile_templates(self):
+        """Compile every template up front, e.g. before a batch job"""
+        return {name: self.render_plan(name) for name in self.certificate_templates}
+
+    def _certificate_fields(self, student_name, course_name, completion_date, score, organization_name):
+        """The values template element text can refer to"""
+        return {
+            'student_name': student_name,
+            'course_name': course_name,
+            'completion_date': completion_date,
+            'score': score,
+            'organization_name': organization_name
+        }
+
+    def generate_certificate_image(self, student_name, course_name, completion_date, score=None, organization_name="OPENFRAUDLABS", template='basic'):
+        """Generate a certificate image using PIL"""
+        fields = self._certificate_fields(student_name, course_name, completion_date, score, organization_name)
+        plan = self.render_plan(template)
+        image = plan.base_image.copy()
+        draw = ImageDraw.Draw(image)
+
+        try:
+            # Only the variable text is drawn per certificate
+            for step in plan.steps:
+                text = step.format(fields)
+                if text is not None:
+                    step.draw(draw, text)
+
+        except Exception as e:
+            # Fallback simple text if anything fails
+            image = Image.new('RGB', (plan.width, plan.height), color=self.certificate_templates[template]['background_color'])
+            draw = ImageDraw.Draw(image)
+            draw.text((100, 50), f"{organization_name}", fill=(255, 255, 255))
+            draw.text((100, 100), "CERTIFICATE OF COMPLETION", fill=(255, 215, 0))
+            draw.text((100, 150), f"Awarded to: {student_name}", fill=(255, 255, 255))
+            draw.text((100, 200), f"Course: {course_name}", fill=(255, 255, 255))
+            draw.text((100, 250), f"Date: {completion_date}", fill=(255, 255, 255))
+            if score:
+                draw.text((100, 300), f"Score: {score}%", fill=(255, 255, 255))
+            draw.text((100, 350), f"Issued by: {organization_name}", fill=(255, 215, 0))
+
+        return image
+
+    def generate_certificate_png(self, cert, organization_name="OPENFRAUDLABS", template='basic'):
+        """PNG bytes for a certificate dict (as stored in user progress)"""
+        image = self.generate_certificate_image(
+            cert['student_name'],
+            cert['course_name'],
+            cert['completion_date'],
+            cert.get('score'),
+            organization_name=organization_name,
+            template=template
+        )
+        buffered = io.BytesIO()
+        image.save(buffered, format="PNG")
+        return buffered.getvalue()
+
+    def render_certificate(self, cert, fmt="png", organization_name="OPENFRAUDLABS", template='basic'):
+        """A certificate dict rendered as PNG bytes ("png") or PDF page content ("pdf-page")"""
+        if fmt == "png":
+            return self.generate_certificate_png(cert, organization_name, template)
+        return self.certificate_page_content(
+            cert['student_name'],
+            cert['course_name'],
+            cert['completion_date'],
+            cert.get('score'),
+            organization_name=organization_name,
+            template=template
+        )
+
+    def certificate_page_content(self, student_name, course_name, completion_date, score=None, organization_name="OPENFRAUDLABS", template='basic'):
+        """Build the PDF drawing operators for one certificate page"""
+        fields = self._certificate_fields(student_name, course_name, completion_date, score, organization_name)
+        plan = self.render_plan(template)
+        ops = [plan.pdf_static]
+        for step in plan.steps:
+            text = step.format(fields)
+            if text is not None:
+                ops.append(step.pdf_ops(text))
+        return b"\n".join(ops)
+
+    def certificate_pdf_writer(self, stream, template='basic'):
+        """A PDFWriter sized for the template, with its images already embedded"""
+        plan = self.render_plan(template)
+        writer = PDFWriter(stream, plan.width, plan.height)
+        for resource, image in plan.pdf_images:
+            writer.add_image(resource, image)
+        return writer
+
+    def write_certificates_pdf(self, certificates, stream, organization_name="OPENFRAUDLABS", template='basic'):
+        """Stream a PDF with one page per certificate dict (as stored in user progress)"""
+        writer = self.certificate_pdf_writer(stream, template)
+        for cert in certificates:
+            writer.add_page(self.certificate_page_content(
+                cert['student_name'],
+                cert['course_name'],
+                cert['completion_date'],
+                cert.get('score'),
+                organization_name=organization_name,
+                template=template
+            ))
+        writer.close()
+
+    def generate_certificate_pdf(self, student_name, course_name, completion_date, score=None, organization_name="OPENFRAUDLABS", template='basic'):
+        """Generate a single-page vector PDF certificate and return its bytes"""
+        cert = {
+            'student_name': student_name,
+            'course_name': course_name,
+            'completion_date': completion_date,
+            'score': score
+        }
+        return self.generate_certificate_bundle_pdf([cert], organization_name=organization_name, template=template)
+
+    def generate_certificate_bundle_pdf(self, certificates, organization_name="OPENFRAUDLABS", template='basic'):
+        """Generate one multi-page PDF for several certificates, e.g. a whole cohort"""
+        buffered = io.BytesIO()
+        self.write_certificates_pdf(certificates, buffered, organization_name=organization_name, template=template)
+        return buffered.getvalue()
+
+    def get_certificate_download_link(self, image, filename="certificate.png"):
+        """Generate a download link for the certificate (a PIL image or PNG bytes)"""
+        if isinstance(image, bytes):
+            png = image
+        else:
+            buffered = io.BytesIO()
+            image.save(buffered, format="PNG")
+            png = buffered.getvalue()
+        img_str = base64.b64encode(png).decode()
+        href = f'<a href="data:image/png;base64,{img_str}" download="{filename}" style="background-color: #4CAF50; color: white; padding: 14px 20px; text-align: center; text-decoration: none; display: inline-block; border-radius: 5px; font-size: 16px; margin: 10px 0;">📄 Download Certificate</a>'
+        return href
+
+    def get_pdf_download_link(self, pdf_bytes, filename="certificate.pdf", label="📄 Download PDF"):
+        """Generate a download link for a PDF certificate or bundle"""
+        pdf_str = base64.b64encode(pdf_bytes).decode()
+        href = f'<a href="data:application/pdf;base64,{pdf_str}" download="{filename}" style="background-color: #1f77b4; color: white; padding: 14px 20px; text-align: center; text-decoration: none; display: inline-block; border-radius: 5px; font-size: 16px; margin: 10px 0;">{label}</a>'
+        return href
+
+    def get_zip_download_link(self, zip_bytes, filename="certificates.zip", label="🗂️ Download ZIP"):
+        """Generate a download link for a ZIP archive, e.g. a transcript with PNG certificates"""
+        zip_str = base64.b64encode(zip_bytes).decode()
+        href = f'<a href="data:application/zip;base64,{zip_str}" download="{filename}" style="background-color: #6c757d; color: white; padding: 14px 20px; text-align: center; text-decoration: none; display: inline-block; border-radius: 5px; font-size: 16px; margin: 10px 0;">{label}</a>'
+        return href
@@ -0,0 +1,222 @@
+"""Validate the course data once and compile it into a catalog artifact.
+
+    python course_catalog.py            # validate course_data.py and write catalog.pkl
+    python course_catalog.py --check    # validate only
+    python course_catalog.py --data-module acme_courses --output catalog-acme.pkl
+
+The app loads catalog.pkl at startup without re-validating. When the artifact is
+missing, from an older format, or older than its data module, the catalog is
+compiled in-process instead (and invalid data raises CatalogError). With
+LEARNING_PLATFORM_DB set, the compiled catalog is also published to the shared
+store for every tenant using the data module, so running processes reload it on
+their next rerun.
+"""
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import os
+import pickle
+import sys
+
+CATALOG_FORMAT = 1
+DEFAULT_ARTIFACT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.pkl")
+DEFAULT_DATA_MODULE = "course_data"
+
+COURSE_KEYS = ('title', 'description', 'level', 'duration', 'certificate_threshold', 'lessons', 'final_quiz')
+LESSON_KEYS = ('id', 'title', 'content', 'video_id', 'video_title', 'duration', 'quiz')
+
+
+class CatalogError(ValueError):
+    """Raised when course data fails validation"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} catalog error(s):\n" + "\n".join(f"  - {error}" for error in errors))
+        self.errors = errors
+
+
+class CompiledCatalog:
+    """Validated course data with dense lesson and question ordinals.
+
+    Every lesson dict gets an 'ordinal' (0..total_lessons-1 across the catalog) and
+    every question dict gets one too, in catalog order.
+    """
+
+    def __init__(self, courses, digest):
+        self.format = CATALOG_FORMAT
+        self.courses = courses
+        self.digest = digest
+        self.lesson_ordinals = {}       # (course_id, lesson_id) -> ordinal
+        self.course_lesson_counts = {}  # course_id -> number of lessons
+        self.total_lessons = 0
+        self.total_questions = 0
+
+        for course_id, course in courses.items():
+            for lesson in course['lessons']:
+                lesson['ordinal'] = self.total_lessons
+                self.lesson_ordinals[(course_id, lesson['id'])] = self.total_lessons
+                self.total_lessons += 1
+                self._number_questions(lesson['quiz']['questions'])
+            self._number_questions(course['final_quiz']['questions'])
+            self.course_lesson_counts[course_id] = len(course['lessons'])
+
+    def _number_questions(self, questions):
+        for question in questions:
+            question['ordinal'] = self.total_questions
+            self.total_questions += 1
+
+
+def _validate_questions(where, quiz, errors):
+    if not isinstance(quiz, dict) or not quiz.get('questions'):
+        errors.append(f"{where}: no questions")
+        return
+    if not isinstance(quiz['questions'], list):
+        errors.append(f"{where}: questions is not a list")
+        return
+    for index, question in enumerate(quiz['questions']):
+        label = f"{where} question {index + 1}"
+        if not isinstance(question, dict):
+            errors.append(f"{label}: not a dict")
+            continue
+        if not question.get('question'):
+            errors.append(f"{label}: missing question text")
+        options = question.get('options')
+        if not options or not isinstance(options, list):
+            errors.append(f"{label}: no options")
+            continue
+        # Answers are looked up with options.index(), so duplicates would grade wrongly
+        if len(set(options)) != len(options):
+            errors.append(f"{label}: duplicate options")
+        correct = question.get('correct')
+        if not isinstance(correct, int) or isinstance(correct, bool) or not 0 <= correct < len(options):
+            errors.append(f"{label}: correct index {correct!r} is outside its {len(options)} options")
+
+
+def validate_catalog(courses):
+    """Return a list of problems in the course data (empty when it is valid)"""
+    errors = []
+    if not isinstance(courses, dict):
+        return ["catalog is not a dict of courses"]
+    if not courses:
+        errors.append("catalog has no courses")
+    for course_id, course in courses.items():
+        if not isinstance(course, dict):
+            errors.append(f"{course_id}: not a dict")
+            continue
+        missing = [key for key in COURSE_KEYS if key not in course]
+        if missing:
+            errors.append(f"{course_id}: missing {', '.join(missing)}")
+        threshold = course.get('certificate_threshold')
+        if threshold is not None and not (isinstance(threshold, (int, float)) and 0 <= threshold <= 100):
+            errors.append(f"{course_id}: certificate_threshold {threshold!r} is not a percentage")
+
+        lessons = course.get('lessons') or []
+        if 'lessons' in course and not lessons:
+            errors.append(f"{course_id}: no lessons")
+        if not isinstance(lessons, list):
+            errors.append(f"{course_id}: lessons is not a list")
+            lessons = []
+        seen_ids = set()
+        for index, lesson in enumerate(lessons):
+            if not isinstance(lesson, dict):
+                errors.append(f"{course_id} lesson {index + 1}: not a dict")
+                continue
+            where = f"{course_id} lesson {lesson.get('id', index + 1)}"
+            missing = [key for key in LESSON_KEYS if key not in lesson]
+            if missing:
+                errors.append(f"{where}: missing {', '.join(missing)}")
+            if 'id' in lesson:
+                if not isinstance(lesson['id'], (int, str)):
+                    errors.append(f"{where}: id is not an int or string")
+                elif lesson['id'] in seen_ids:
+                    errors.append(f"{where}: duplicate lesson id")
+                else:
+                    seen_ids.add(lesson['id'])
+            if 'quiz' in lesson:
+                _validate_questions(f"{where} quiz", lesson['quiz'], errors)
+
+        if 'final_quiz' in course:
+            if not isinstance(course['final_quiz'], dict):
+                errors.append(f"{course_id} final_quiz: not a dict")
+                continue
+            if not course['final_quiz'].get('title'):
+                errors.append(f"{course_id} final_quiz: missing title")
+            _validate_questions(f"{course_id} final_quiz", course['final_quiz'], errors)
+    return errors
+
+
+def compile_catalog(courses):
+    """Validate courses and compile them, raising CatalogError if anything is wrong"""
+    errors = validate_catalog(courses)
+    if errors:
+        raise CatalogError(errors)
+    payload = pickle.dumps(courses, protocol=pickle.HIGHEST_PROTOCOL)
+    # Compile a copy so the source data is left untouched
+    return CompiledCatalog(pickle.loads(payload), hashlib.sha256(payload).hexdigest())
+
+
+def write_artifact(catalog, path=DEFAULT_ARTIFACT):
+    """Write a compiled catalog atomically, so running processes never read half a file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def _artifact_is_current(path, data_module):
+    spec = importlib.util.find_spec(data_module)
+    try:
+        return os.path.getmtime(path) >= os.path.getmtime(spec.origin)
+    except (OSError, AttributeError, TypeError):
+        return False
+
+
+def load_catalog(path=DEFAULT_ARTIFACT, data_module=DEFAULT_DATA_MODULE):
+    """The compiled catalog, from the artifact when it is current"""
+    if _artifact_is_current(path, data_module):
+        with open(path, 'rb') as f:
+            catalog = pickle.load(f)
+        if getattr(catalog, 'format', None) == CATALOG_FORMAT:
+            return catalog
+    return compile_catalog(importlib.import_module(data_module).COURSES)
+
+
+def publish_catalog(catalog, data_module=DEFAULT_DATA_MODULE):
+    """Publish a catalog to the shared store for each tenant built from data_module; returns [(tenant_id, version)]"""
+    from shared_store import open_shared_store
+    from tenants import TENANT_REGISTRY
+
+    store = open_shared_store()
+    if store is None:
+        return []
+    # publish_catalog only bumps the version (and clears cached certificates) when the catalog changed
+    return [
+        (tenant_id, store.publish_catalog(tenant_id, catalog))
+        for tenant_id, tenant in TENANT_REGISTRY.items() if tenant.catalog_module == data_module
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=DEFAULT_ARTIFACT, help="artifact path (default: %(default)s)")
+    parser.add_argument("--data-module", default=DEFAULT_DATA_MODULE, help="module defining COURSES (default: %(default)s)")
+    parser.add_argument("--check", action="store_true", help="validate without writing the artifact")
+    args = parser.parse_args()
+
+    try:
+        catalog = compile_catalog(importlib.import_module(args.data_module).COURSES)
+    except CatalogError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if not args.check:
+        write_artifact(catalog, args.output)
+        for tenant_id, version in publish_catalog(catalog, args.data_module):
+            print(f"Published to {tenant_id} (version {version})")
+    print(f"{len(catalog.courses)} courses, {catalog.total_lessons} lessons, {catalog.total_questions} questions OK")
+    return 0
+
+
+if __name__ == "__main__":
+    # Run through the imported module so pickled classes resolve to course_catalog, not __main__
+    import course_catalog
+    sys.exit(course_catalog.main())
@@ -0,0 +1,179 @@
+"""Course content. Edit here, then rebuild the catalog artifact with ``python course_catalog.py``."""
+
+COURSES = {
+    'budgeting_basics': {
+        'title': '📊 Budgeting Basics',
+        'description': 'Learn how to create and maintain a budget',
+        'level': 'Beginner',
+        'duration': '2 hours',
+        'certificate_threshold': 70, # Score needed on FINAL EXAM
+        'lessons': [
+            {
+                'id': 1,
+                'title': 'What is Budgeting?',
+                'content': """
+                # Understanding Budgeting
+
+A budget is a plan for your money. It helps you:
+- Track income and expenses
+- Achieve financial goals
+- Avoid debt
+- Save for the future
+                """,
+                'video_id': '6X024dlVguA',
+                'video_title': 'Budgeting Basics for Beginners',
+                'duration': '8:30',
+                'quiz': {
+                    'questions': [
+                        {
+                            'question': 'What is the primary purpose of a budget?',
+                            'options': ['To restrict spending', 'To plan and track income/expenses', 'To get rich quick', 'To impress friends'],
+                            'correct': 1
+                        },
+                        {
+                            'question': 'What percentage of income should go to needs in the 50/30/20 rule?',
+                            'options': ['30%', '50%', '20%', '40%'],
+                            'correct': 1
+                        }
+                    ]
+                }
+            },
+            {
+                'id': 2,
+                'title': 'Creating Your First Budget',
+                'content': """
+                # Creating Your First Budget
+
+## Step-by-Step Guide:
+
+1. **Calculate Monthly Income**
+   - List all income sources
+   - Use net income (after taxes)
+2. **List Monthly Expenses**
+   - Fixed (rent, car payment)
+   - Variable (groceries, gas)
+3. **Subtract Expenses from Income**
+   - Positive result = Good!
+   - Negative result = Adjust expenses!
+                """,
+                'video_id': 'yY3IUVBiPx4',
+                'video_title': 'How to Create a Budget',
+                'duration': '10:15',
+                'quiz': {
+                    'questions': [
+                        {
+                            'question': 'What should you use for budgeting calculations?',
+                            'options': [
+                                'Gross income',
+                                'Net income',
+                                'Yearly income',
+                                'Expected income'
+                            ],
+                            'correct': 1
+                        }
+                    ]
+                }
+            }
+        ],
+        # *** NEW: Final Exam for the whole course ***
+        'final_quiz': {
+            'title': 'Budgeting Basics Final Exam',
+            'questions': [
+                {
+                    'question': 'What is a "zero-based" budget?',
+                    'options': ['A budget with no income', 'A budget where Income - Expenses = 0', 'A budget for people with zero debt', 'A budget with zero savings'],
+                    'correct': 1
+                },
+                {
+                    'question': 'Which of these is a "variable" expense?',
+                    'options': ['Rent', 'Car Insurance', 'Groceries', 'Loan Payment'],
+                    'correct': 2
+                },
+                {
+                    'question': 'The 50/30/20 rule allocates 20% to...',
+                    'options': ['Needs', 'Wants', 'Savings & Debt Repayment', 'Taxes'],
+                    'correct': 2
+                }
+            ]
+        }
+    },
+    'saving_investing': {
+        'title': '💸 Saving & Investing',
+        'description': 'Build wealth through smart saving and investing strategies',
+        'level': 'Intermediate',
+        'duration': '3 hours',
+        'certificate_threshold': 75,
+        'lessons': [
+            {
+                'id': 1,
+                'title': 'The Power of Compound Interest',
+                'content': """
+                # Compound Interest: Your Best Friend
+
+## What is Compound Interest?
+Interest earned on both your initial investment AND accumulated interest.
+                """,
+                'video_id': 'wf91rEGs88Y',
+                'video_title': 'The Power of Compound Interest',
+                'duration': '9:20',
+                'quiz': {
+                    'questions': [
+                        {
+                            'question': 'What makes compound interest powerful?',
+                            'options': [
+                                'Earning interest on interest',
+                                'High risk investments',
+                                'Government guarantees',
+                                'Daily trading'
+                            ],
+                            'correct': 0
+                        }
+                    ]
+                }
+            },
+            {
+                'id': 2,
+                'title': 'Stocks vs. Bonds',
+                'content': """
+                # Stocks vs. Bonds: The Basics
+
+* **Stocks (Equities):** You own a small piece (share) of a company. Higher potential returns, higher risk.
+* **Bonds (Debt):** You are lending money to a company or government. Lower returns, lower risk.
+                """,
+                'video_id': 'rs1md3e4a-4',
+                'video_title': 'Stocks vs Bonds Explained',
+                'duration': '7:45',
+                'quiz': {
+                    'questions': [
+                        {
+                            'question': 'If you buy a stock, you own:',
+                            'options': ['A loan', 'A piece of the company', 'A guaranteed return', 'A bond'],
+                            'correct': 1
+                        }
+                    ]
+                }
+            }
+        ],
+        # *** NEW: Final Exam for the whole course ***
+        'final_quiz': {
+            'title': 'Saving & Investing Final Exam',
+            'questions': [
+                {
+                    'question': 'What is "diversification" in investing?',
+                    'options': ['Putting all money in one stock', 'Spreading investments across different assets', 'Only buying bonds', 'Only buying stocks'],
+                    'correct': 1
+                },
+                {
+                    'question': 'Generally, which is considered higher risk?',
+                    'options': ['Stocks', 'Bonds', 'A savings account', 'All are equal'],
+                    'correct': 0
+                },
+                {
+                    'question': 'Compound interest works best over a...?',
+                    'options': ['Short period', 'Long period', 'It does not depend on time', 'Period of high risk'],
+                    'correct': 1
+                }
+            ]
+        }
+    }
+}
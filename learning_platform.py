@@ -3,14 +3,27 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont
+import hashlib
 import io
-import base64
+import json
+import pickle
+import time
+import uuid
 import numpy as np
+from activity import activity_series, learner_activity, record_certificate, record_lesson, record_quiz
+from certificates import CertificateGenerator
+from course_catalog import load_catalog
+from review import due_count, forget, next_due, next_review_time, prune, question_key, record_answer, review_state
+from shared_store import CatalogCache, certificate_cache_key, open_shared_store, save_merged_progress
+from tenants import TenantCaches, resolve_tenant
+from transcripts import write_transcript_pdf, write_transcript_zip
+
+# Tenant for this request, e.g. ?tenant=openfraudlabs
+tenant = resolve_tenant(st.query_params.get('tenant'))
 
 # Page configuration
 st.set_page_config(
-    page_title="OPENFRAUDLABS - Finance Learning",
+    page_title=f"{tenant.organization_name} - Finance Learning",
     page_icon="💰",
     layout="wide",
     initial_sidebar_state="expanded"
@@ -131,296 +144,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-class CertificateGenerator:
-    def __init__(self):
-        self.certificate_templates = {
-            'basic': {
-                'background_color': (139, 69, 19),  # SaddleBrown
-                'border_color': (255, 215, 0),     # Gold
-                'text_color': (255, 255, 255),       # White
-                'accent_color': (255, 215, 0)        # Gold
-            }
-        }
-    
-    def generate_certificate_image(self, student_name, course_name, completion_date, score=None, organization_name="OPENFRAUDLABS"):
-        """Generate a certificate image using PIL"""
-        # Create a blank certificate image
-        width, height = 800, 600
-        image = Image.new('RGB', (width, height), color=self.certificate_templates['basic']['background_color'])
-        draw = ImageDraw.Draw(image)
-        
-        try:
-            # Try to use a fancy font, fall back to default if not available
-            try:
-                title_font = ImageFont.truetype("arialbd.ttf", 40)
-                name_font = ImageFont.truetype("arialbd.ttf", 36)
-                text_font = ImageFont.truetype("arial.ttf", 24)
-                small_font = ImageFont.truetype("arial.ttf", 18)
-                org_font = ImageFont.truetype("arialbd.ttf", 28)
-            except:
-                # Fallback to default font
-                title_font = ImageFont.load_default()
-                name_font = ImageFont.load_default()
-                text_font = ImageFont.load_default()
-                small_font = ImageFont.load_default()
-                org_font = ImageFont.load_default()
-            
-            # Draw border
-            draw.rectangle([10, 10, width-10, height-10], outline=self.certificate_templates['basic']['border_color'], width=8)
-            
-            # *** NEW: Draw Organization Name at Top ***
-            org_bbox = draw.textbbox((0, 0), organization_name, font=org_font)
-            org_width = org_bbox[2] - org_bbox[0]
-            draw.text(((width - org_width) // 2, 40), organization_name, fill=self.certificate_templates['basic']['text_color'], font=org_font)
-            
-            # Draw title
-            title = "CERTIFICATE OF COMPLETION"
-            title_bbox = draw.textbbox((0, 0), title, font=title_font)
-            title_width = title_bbox[2] - title_bbox[0]
-            draw.text(((width - title_width) // 2, 100), title, fill=self.certificate_templates['basic']['accent_color'], font=title_font)
-            
-            # Draw subtitle
-            subtitle = "This certifies that"
-            subtitle_bbox = draw.textbbox((0, 0), subtitle, font=text_font)
-            subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
-            draw.text(((width - subtitle_width) // 2, 180), subtitle, fill=self.certificate_templates['basic']['text_color'], font=text_font)
-            
-            # Draw student name
-            name_bbox = draw.textbbox((0, 0), student_name, font=name_font)
-            name_width = name_bbox[2] - name_bbox[0]
-            draw.text(((width - name_width) // 2, 240), student_name, fill=self.certificate_templates['basic']['accent_color'], font=name_font)
-            
-            # Draw course completion text
-            course_text = f"has successfully completed the course"
-            course_bbox = draw.textbbox((0, 0), course_text, font=text_font)
-            course_width = course_bbox[2] - course_bbox[0]
-            draw.text(((width - course_width) // 2, 310), course_text, fill=self.certificate_templates['basic']['text_color'], font=text_font)
-            
-            # Draw course name
-            course_name_bbox = draw.textbbox((0, 0), course_name, font=name_font)
-            course_name_width = course_name_bbox[2] - course_name_bbox[0]
-            draw.text(((width - course_name_width) // 2, 360), course_name, fill=self.certificate_templates['basic']['accent_color'], font=name_font)
-            
-            # Draw score if provided
-            if score:
-                score_text = f"with a final exam score of {score}%"
-                score_bbox = draw.textbbox((0, 0), score_text, font=text_font)
-                score_width = score_bbox[2] - score_bbox[0]
-                draw.text(((width - score_width) // 2, 420), score_text, fill=self.certificate_templates['basic']['text_color'], font=text_font)
-            
-            # Draw date
-            date_text = f"Completed on: {completion_date}"
-            date_bbox = draw.textbbox((0, 0), date_text, font=small_font)
-            date_width = date_bbox[2] - date_bbox[0]
-            draw.text(((width - date_width) // 2, 480), date_text, fill=self.certificate_templates['basic']['text_color'], font=small_font)
-            
-            # *** MODIFIED: Draw signature line with Organization Name ***
-            signature_text = organization_name
-            signature_bbox = draw.textbbox((0, 0), signature_text, font=text_font)
-            signature_width = signature_bbox[2] - signature_bbox[0]
-            draw.text(((width - signature_width) // 2, 530), signature_text, fill=self.certificate_templates['basic']['accent_color'], font=text_font)
-            
-        except Exception as e:
-            # Fallback simple text if anything fails
-            draw.text((100, 50), f"{organization_name}", fill=(255, 255, 255))
-            draw.text((100, 100), "CERTIFICATE OF COMPLETION", fill=(255, 215, 0))
-            draw.text((100, 150), f"Awarded to: {student_name}", fill=(255, 255, 255))
-            draw.text((100, 200), f"Course: {course_name}", fill=(255, 255, 255))
-            draw.text((100, 250), f"Date: {completion_date}", fill=(255, 255, 255))
-            if score:
-                draw.text((100, 300), f"Score: {score}%", fill=(255, 255, 255))
-            draw.text((100, 350), f"Issued by: {organization_name}", fill=(255, 215, 0))
-        
-        return image
-    
-    def get_certificate_download_link(self, image, filename="certificate.png"):
-        """Generate a download link for the certificate"""
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        href = f'<a href="data:image/png;base64,{img_str}" download="{filename}" style="background-color: #4CAF50; color: white; padding: 14px 20px; text-align: center; text-decoration: none; display: inline-block; border-radius: 5px; font-size: 16px; margin: 10px 0;">📄 Download Certificate</a>'
-        return href
-
 class FinanceLearningPlatform:
-    def __init__(self):
-        self.certificate_generator = CertificateGenerator()
-        self.courses = {
-            'budgeting_basics': {
-                'title': '📊 Budgeting Basics',
-                'description': 'Learn how to create and maintain a budget',
-                'level': 'Beginner',
-                'duration': '2 hours',
-                'certificate_threshold': 70, # Score needed on FINAL EXAM
-                'lessons': [
-                    {
-                        'id': 1,
-                        'title': 'What is Budgeting?',
-                        'content': """
-                        # Understanding Budgeting
-
-A budget is a plan for your money. It helps you:
-- Track income and expenses
-- Achieve financial goals
-- Avoid debt
-- Save for the future
-                        """,
-                        'video_id': '6X024dlVguA',
-                        'video_title': 'Budgeting Basics for Beginners',
-                        'duration': '8:30',
-                        'quiz': {
-                            'questions': [
-                                {
-                                    'question': 'What is the primary purpose of a budget?',
-                                    'options': ['To restrict spending', 'To plan and track income/expenses', 'To get rich quick', 'To impress friends'],
-                                    'correct': 1
-                                },
-                                {
-                                    'question': 'What percentage of income should go to needs in the 50/30/20 rule?',
-                                    'options': ['30%', '50%', '20%', '40%'],
-                                    'correct': 1
-                                }
-                            ]
-                        }
-                    },
-                    {
-                        'id': 2,
-                        'title': 'Creating Your First Budget',
-                        'content': """
-                        # Creating Your First Budget
-        
-## Step-by-Step Guide:
-        
-1. **Calculate Monthly Income**
-   - List all income sources
-   - Use net income (after taxes)
-2. **List Monthly Expenses**
-   - Fixed (rent, car payment)
-   - Variable (groceries, gas)
-3. **Subtract Expenses from Income**
-   - Positive result = Good!
-   - Negative result = Adjust expenses!
-                        """,
-                        'video_id': 'yY3IUVBiPx4',
-                        'video_title': 'How to Create a Budget',
-                        'duration': '10:15',
-                        'quiz': {
-                            'questions': [
-                                {
-                                    'question': 'What should you use for budgeting calculations?',
-                                    'options': [
-                                        'Gross income',
-                                        'Net income',
-                                        'Yearly income',
-                                        'Expected income'
-                                    ],
-                                    'correct': 1
-                                }
-                            ]
-                        }
-                    }
-                ],
-                # *** NEW: Final Exam for the whole course ***
-                'final_quiz': {
-                    'title': 'Budgeting Basics Final Exam',
-                    'questions': [
-                        {
-                            'question': 'What is a "zero-based" budget?',
-                            'options': ['A budget with no income', 'A budget where Income - Expenses = 0', 'A budget for people with zero debt', 'A budget with zero savings'],
-                            'correct': 1
-                        },
-                        {
-                            'question': 'Which of these is a "variable" expense?',
-                            'options': ['Rent', 'Car Insurance', 'Groceries', 'Loan Payment'],
-                            'correct': 2
-                        },
-                        {
-                            'question': 'The 50/30/20 rule allocates 20% to...',
-                            'options': ['Needs', 'Wants', 'Savings & Debt Repayment', 'Taxes'],
-                            'correct': 2
-                        }
-                    ]
-                }
-            },
-            'saving_investing': {
-                'title': '💸 Saving & Investing',
-                'description': 'Build wealth through smart saving and investing strategies',
-                'level': 'Intermediate',
-                'duration': '3 hours',
-                'certificate_threshold': 75,
-                'lessons': [
-                    {
-                        'id': 1,
-                        'title': 'The Power of Compound Interest',
-                        'content': """
-                        # Compound Interest: Your Best Friend
-        
-## What is Compound Interest?
-Interest earned on both your initial investment AND accumulated interest.
-                        """,
-                        'video_id': 'wf91rEGs88Y',
-                        'video_title': 'The Power of Compound Interest',
-                        'duration': '9:20',
-                        'quiz': {
-                            'questions': [
-                                {
-                                    'question': 'What makes compound interest powerful?',
-                                    'options': [
-                                        'Earning interest on interest',
-                                        'High risk investments',
-                                        'Government guarantees',
-                                        'Daily trading'
-                                    ],
-                                    'correct': 0
-                                }
-                            ]
-                        }
-                    },
-                    {
-                        'id': 2,
-                        'title': 'Stocks vs. Bonds',
-                        'content': """
-                        # Stocks vs. Bonds: The Basics
-
-* **Stocks (Equities):** You own a small piece (share) of a company. Higher potential returns, higher risk.
-* **Bonds (Debt):** You are lending money to a company or government. Lower returns, lower risk.
-                        """,
-                        'video_id': 'rs1md3e4a-4',
-                        'video_title': 'Stocks vs Bonds Explained',
-                        'duration': '7:45',
-                        'quiz': {
-                            'questions': [
-                                {
-                                    'question': 'If you buy a stock, you own:',
-                                    'options': ['A loan', 'A piece of the company', 'A guaranteed return', 'A bond'],
-                                    'correct': 1
-                                }
-                            ]
-                        }
-                    }
-                ],
-                # *** NEW: Final Exam for the whole course ***
-                'final_quiz': {
-                    'title': 'Saving & Investing Final Exam',
-                    'questions': [
-                        {
-                            'question': 'What is "diversification" in investing?',
-                            'options': ['Putting all money in one stock', 'Spreading investments across different assets', 'Only buying bonds', 'Only buying stocks'],
-                            'correct': 1
-                        },
-                        {
-                            'question': 'Generally, which is considered higher risk?',
-                            'options': ['Stocks', 'Bonds', 'A savings account', 'All are equal'],
-                            'correct': 0
-                        },
-                        {
-                            'question': 'Compound interest works best over a...?',
-                            'options': ['Short period', 'Long period', 'It does not depend on time', 'Period of high risk'],
-                            'correct': 1
-                        }
-                    ]
-                }
-            }
-        }
+    def __init__(self, certificate_generator=None, catalog=None, store=None, tenant_id=None, on_progress_change=None):
+        self.certificate_generator = certificate_generator or CertificateGenerator()
+        # Validated, precompiled course data (see course_catalog.py)
+        self.catalog = catalog or load_catalog()
+        self.courses = self.catalog.courses
+        # Shared store in multi-process mode; also collects cohort activity
+        self.store = store
+        self.tenant_id = tenant_id
+        # Called whenever a method changes user progress, so it is only saved when it changed
+        self.on_progress_change = on_progress_change or (lambda: None)
         
         self.achievements = {
             'first_lesson': {'name': 'First Step', 'description': 'Complete your first lesson'},
@@ -430,7 +164,7 @@ Interest earned on both your initial investment AND accumulated interest.
 
     def calculate_progress(self, completed_lessons):
         """Calculate overall progress percentage"""
-        total_lessons = sum(len(course['lessons']) for course in self.courses.values())
+        total_lessons = self.catalog.total_lessons
         return (len(completed_lessons) / total_lessons) * 100 if total_lessons > 0 else 0
 
     def is_lesson_completed(self, course_id, lesson_id, user_progress):
@@ -441,14 +175,71 @@ Interest earned on both your initial investment AND accumulated interest.
     def mark_lesson_completed(self, course_id, lesson_id, user_progress):
         """Mark a lesson as completed"""
         if not self.is_lesson_completed(course_id, lesson_id, user_progress):
+            now = datetime.now()
+            # Backfill activity from history before this lesson joins it, so it is counted once
+            activity = learner_activity(user_progress)
             user_progress['completed_lessons'].append({
                 'course': course_id, 
                 'id': lesson_id,
-                'completed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                'completed_at': now.strftime("%Y-%m-%d %H:%M:%S")
             })
+            self._share_activity(now, record_lesson(activity, course_id, now))
+            self.on_progress_change()
             return True
         return False
 
+    def record_quiz_attempt(self, user_progress, score):
+        """Add a lesson quiz or final exam score to the activity timeline"""
+        now = datetime.now()
+        self._share_activity(now, record_quiz(learner_activity(user_progress), score, now))
+        self.on_progress_change()
+
+    def _share_activity(self, when, amounts):
+        """Mirror a learner's activity into the cohort buckets when running with a shared store"""
+        if self.store:
+            self.store.record_activity(self.tenant_id, when, amounts)
+
+    def grade_quiz(self, questions, answers):
+        """Score a quiz as a percentage; answers are the chosen option indexes"""
+        correct_answers = sum(1 for question, answer in zip(questions, answers) if answer == question['correct'])
+        return (correct_answers / len(questions)) * 100
+
+    def record_review_answers(self, user_progress, course_id, lesson_id, questions, answers):
+        """Feed quiz answers into the learner's spaced-repetition queue; lesson_id is 'final' for final exams"""
+        state = review_state(user_progress)
+        now = time.time()
+        for question, answer in zip(questions, answers):
+            record_answer(state, question_key(course_id, lesson_id, question), answer == question['correct'], now)
+        self.on_progress_change()
+
+    def review_question(self, key):
+        """(course, quiz source title, question) for a review card, or None if its question left the catalog or changed"""
+        course_id, lesson_id, _ = key.rsplit(':', 2)
+        course = self.courses.get(course_id)
+        if course is None:
+            return None
+        if lesson_id == 'final':
+            quiz, source = course['final_quiz'], course['final_quiz']['title']
+        else:
+            lesson = next((l for l in course['lessons'] if str(l['id']) == lesson_id), None)
+            if lesson is None:
+                return None
+            quiz, source = lesson['quiz'], lesson['title']
+        question = next((q for q in quiz['questions'] if question_key(course_id, lesson_id, q) == key), None)
+        return (course, source, question) if question else None
+
+    def prune_review_cards(self, user_progress):
+        """Drop review cards whose question left the catalog or changed since it was answered"""
+        if not user_progress.get('review'):
+            return
+        keys = set()
+        for course_id, course in self.courses.items():
+            for lesson in course['lessons']:
+                keys.update(question_key(course_id, lesson['id'], q) for q in lesson['quiz']['questions'])
+            keys.update(question_key(course_id, 'final', q) for q in course['final_quiz']['questions'])
+        if prune(user_progress['review'], keys):
+            self.on_progress_change()
+
     def calculate_course_score(self, course_id, user_progress):
         """Calculate average *lesson quiz* score for a course"""
         quiz_scores = []
@@ -461,9 +252,8 @@ Interest earned on both your initial investment AND accumulated interest.
 
     def is_course_completed(self, course_id, user_progress):
         """Check if all lessons in course are completed"""
-        course_lessons = [lesson['id'] for lesson in self.courses[course_id]['lessons']]
         completed_lessons = [lesson['id'] for lesson in user_progress['completed_lessons'] if lesson['course'] == course_id]
-        return len(completed_lessons) == len(course_lessons)
+        return len(completed_lessons) == self.catalog.course_lesson_counts[course_id]
 
     # *** MODIFIED: Award certificate based on FINAL EXAM score ***
     def award_certificate(self, course_id, user_progress, student_name, final_score):
@@ -488,11 +278,15 @@ Interest earned on both your initial investment AND accumulated interest.
             # Check if certificate already exists
             existing_cert = next((c for c in user_progress['certificates'] if c['course_id'] == course_id), None)
             if not existing_cert:
+                activity = learner_activity(user_progress)
                 user_progress['certificates'].append(certificate_data)
+                awarded_at = datetime.fromisoformat(certificate_data['awarded_at'])
+                self._share_activity(awarded_at, record_certificate(activity, course_id, awarded_at))
                 
                 # Award certificate achievement
                 if 'Certified Learner' not in user_progress['achievements']:
                     user_progress['achievements'].append('Certified Learner')
+                self.on_progress_change()
                 
                 return certificate_data
         return None
@@ -510,10 +304,168 @@ def display_video_lesson(video_id, video_title):
     </div>
     """, unsafe_allow_html=True)
 
-def initialize_session_state():
-    """Initialize all required session state variables"""
-    if 'user_progress' not in st.session_state:
-        st.session_state.user_progress = {
+def display_activity_charts(rows, granularity, key):
+    """Lessons completed and quiz score trend from activity_series rows"""
+    if not rows:
+        st.info("No activity recorded yet.")
+        return
+    df = pd.DataFrame(rows)
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.bar(
+            df, x='period', y='lessons', title=f"Lessons Completed ({granularity})",
+            labels={'period': '', 'lessons': 'Lessons'}
+        )
+        st.plotly_chart(fig, use_container_width=True, key=f"{key}_lessons")
+    with col2:
+        scores = df.dropna(subset=['avg_quiz_score'])
+        fig = px.line(
+            scores, x='period', y='avg_quiz_score', markers=True, title="Quiz Score Trend",
+            labels={'period': '', 'avg_quiz_score': 'Average score (%)'}
+        )
+        fig.update_yaxes(range=[0, 100])
+        st.plotly_chart(fig, use_container_width=True, key=f"{key}_quiz_scores")
+
+@st.cache_resource
+def get_tenant_caches():
+    """Per-tenant cache shards for this process"""
+    return TenantCaches()
+
+def get_certificate_generator(tenant):
+    """The tenant's certificate generator, pinned so its compiled templates survive reruns"""
+    return get_tenant_caches().pinned(
+        tenant.tenant_id, 'certificate_generator', lambda: CertificateGenerator(tenant.certificate_templates),
+        # Compiled plans are dominated by their pre-rendered base images
+        lambda g: sum(t.get('size', (800, 600))[0] * t.get('size', (800, 600))[1] * 3 for t in g.certificate_templates.values())
+    )
+
+def get_catalog(tenant):
+    """The tenant's compiled course catalog, pinned in its shard"""
+    return get_tenant_caches().pinned(
+        tenant.tenant_id, 'catalog', lambda: load_catalog(tenant.catalog_artifact, tenant.catalog_module),
+        lambda catalog: len(pickle.dumps(catalog))
+    )
+
+@st.cache_resource
+def get_shared_store():
+    """The shared store in multi-process mode, None otherwise"""
+    return open_shared_store()
+
+def get_catalog_cache(tenant):
+    """The tenant's up-to-date catalog cache backed by the shared store, pinned in its shard"""
+    def create():
+        # Only seed an empty store: a process with a stale artifact must not roll the catalog back.
+        # New catalogs are published with `python course_catalog.py`; processes reload on their next rerun.
+        get_shared_store().publish_catalog(
+            tenant.tenant_id, load_catalog(tenant.catalog_artifact, tenant.catalog_module), replace=False
+        )
+        return CatalogCache(get_shared_store(), tenant.tenant_id)
+
+    catalog_cache = get_tenant_caches().pinned(tenant.tenant_id, 'catalog_cache', create, lambda cache: cache.size_bytes)
+    version = catalog_cache.version
+    catalog_cache.get()
+    if catalog_cache.version != version:
+        # A newly loaded catalog is counted at its own size
+        get_tenant_caches().shard(tenant.tenant_id).pin('catalog_cache', catalog_cache, catalog_cache.size_bytes)
+    return catalog_cache
+
+def learner_identity():
+    """A stable id for this learner, independent of the name they type.
+
+    The signed-in account when Streamlit auth is configured; otherwise a random id
+    generated on the first visit and kept in the ?learner= query parameter, so the
+    learner's link (or bookmark) brings their progress back on any process.
+    """
+    if 'learner_identity' not in st.session_state:
+        user = getattr(st, 'user', None)
+        account = user.get('email') if user is not None and user.get('is_logged_in') else None
+        if account:
+            st.session_state.learner_identity = f"user:{account}"
+        else:
+            learner = st.query_params.get('learner')
+            if not learner:
+                learner = st.query_params['learner'] = uuid.uuid4().hex
+            st.session_state.learner_identity = learner
+    return st.session_state.learner_identity
+
+def learner_key(tenant):
+    """The learner's record id in the shared store, namespaced by tenant"""
+    return f"{tenant.tenant_id}/{learner_identity()}"
+
+def mark_progress_changed():
+    """Flag this session's progress for saving; called wherever progress changes"""
+    st.session_state.progress_changed = True
+
+def sync_shared_progress(store, tenant):
+    """Save this session's progress to the shared store if it was marked as changed"""
+    progress = st.session_state.user_progress
+    if not progress['student_name_set'] or not st.session_state.get('progress_changed'):
+        return
+    revisions = st.session_state.setdefault('progress_revisions', {})
+    # Another session of the same learner may have saved meanwhile; its changes are merged in, not overwritten
+    merged, revisions[tenant.tenant_id] = save_merged_progress(
+        store, learner_key(tenant), progress, revisions.get(tenant.tenant_id, 0)
+    )
+    if merged is not progress:
+        progress.clear()
+        progress.update(merged)
+    st.session_state.progress_changed = False
+
+def render_certificate(generator, cert, tenant, fmt="png", store=None, catalog_version=0):
+    """A certificate's PNG bytes or PDF page content ("pdf-page"), from the tenant's cache shard or the shared cache when possible"""
+    cache_key = certificate_cache_key(cert, tenant.organization_name, tenant.certificate_template, catalog_version, fmt)
+    shard = get_tenant_caches().shard(tenant.tenant_id)
+    data = shard.get(cache_key)
+    if data:
+        return data
+    if store:
+        data = store.get_certificate(tenant.tenant_id, cache_key)
+    if not data:
+        data = generator.render_certificate(cert, fmt, tenant.organization_name, tenant.certificate_template)
+        if store:
+            store.put_certificate(tenant.tenant_id, cache_key, data, tenant.cache_quota_bytes)
+    shard.put(cache_key, data, len(data))
+    return data
+
+def render_transcript(platform, tenant, fmt, store=None, catalog_version=0):
+    """This session's transcript as PDF or ZIP bytes, cached in the tenant's shard until progress changes"""
+    progress = st.session_state.user_progress
+    fingerprint = json.dumps(
+        [progress[key] for key in ('student_name', 'completed_lessons', 'quiz_scores', 'final_quiz_scores', 'certificates')],
+        sort_keys=True
+    )
+    cache_key = f"transcript:{fmt}:{catalog_version}:" + hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    def build():
+        buffered = io.BytesIO()
+        if fmt == 'zip':
+            # Both formats reuse certificate renders cached for this tab and by other processes
+            write_transcript_zip(
+                platform.certificate_generator, platform.catalog, progress, buffered,
+                tenant.organization_name, tenant.certificate_template,
+                certificate_png=lambda cert: render_certificate(platform.certificate_generator, cert, tenant, "png", store, catalog_version)
+            )
+        else:
+            write_transcript_pdf(
+                platform.certificate_generator, platform.catalog, progress, buffered,
+                tenant.organization_name, tenant.certificate_template,
+                certificate_page=lambda cert: render_certificate(platform.certificate_generator, cert, tenant, "pdf-page", store, catalog_version)
+            )
+        return buffered.getvalue()
+
+    return get_tenant_caches().get_or_create(tenant.tenant_id, cache_key, build)
+
+def initialize_session_state(tenant, store=None):
+    """Initialize all required session state variables; progress is kept per tenant"""
+    progress_by_tenant = st.session_state.setdefault('tenant_progress', {})
+    if tenant.tenant_id not in progress_by_tenant and store:
+        # Returning learners pick up their progress from any process
+        saved_progress, revision = store.load_progress_record(learner_key(tenant))
+        if saved_progress:
+            progress_by_tenant[tenant.tenant_id] = saved_progress
+            st.session_state.setdefault('progress_revisions', {})[tenant.tenant_id] = revision
+    if tenant.tenant_id not in progress_by_tenant:
+        progress_by_tenant[tenant.tenant_id] = {
             'completed_lessons': [],  # Tracks completed lessons
             'quiz_scores': {},        # Tracks *lesson* quiz scores
             'final_quiz_scores': {},  # *** NEW: Tracks *final exam* scores ***
@@ -525,15 +477,31 @@ def initialize_session_state():
             'student_name': 'Finance Learner',
             'student_name_set': False
         }
+    st.session_state.user_progress = progress_by_tenant[tenant.tenant_id]
 
 def main():
     # *** MODIFIED: Added Organization Name to Title ***
-    st.markdown('<h1 class="main-header">💰 FinanceMaster by OPENFRAUDLABS</h1>', unsafe_allow_html=True)
-    st.markdown('<h3 style="text-align: center; color: #666;">Personal Finance Education Platform</h3>', unsafe_allow_html=True)
+    st.markdown(f'<h1 class="main-header">💰 {tenant.app_name} by {tenant.organization_name}</h1>', unsafe_allow_html=True)
+    st.markdown(f'<h3 style="text-align: center; color: #666;">{tenant.tagline}</h3>', unsafe_allow_html=True)
     
     # Initialize platform and session state
-    platform = FinanceLearningPlatform()
-    initialize_session_state()
+    store = get_shared_store()
+    catalog_cache = get_catalog_cache(tenant) if store else None
+    platform = FinanceLearningPlatform(
+        get_certificate_generator(tenant),
+        catalog_cache.catalog if store else get_catalog(tenant),
+        store,
+        tenant.tenant_id,
+        mark_progress_changed
+    )
+    initialize_session_state(tenant, store)
+    pruned = st.session_state.setdefault('review_pruned', set())
+    if tenant.tenant_id not in pruned:
+        # Saved cards may predate catalog edits; the review tab also drops them lazily as they come due
+        platform.prune_review_cards(st.session_state.user_progress)
+        pruned.add(tenant.tenant_id)
+    if store:
+        sync_shared_progress(store, tenant)
     
     # Student name input
     if not st.session_state.user_progress['student_name_set']:
@@ -552,6 +520,7 @@ def main():
                 if student_name and student_name.strip():
                     st.session_state.user_progress['student_name'] = student_name.strip()
                     st.session_state.user_progress['student_name_set'] = True
+                    mark_progress_changed()
                     st.success(f"Welcome, {student_name.strip()}! 🎉")
                     st.rerun()
                 else:
@@ -574,6 +543,7 @@ def main():
         # Completed lessons and certificates
         st.write(f"**Lessons Completed:** {len(st.session_state.user_progress['completed_lessons'])}")
         st.write(f"**Certificates Earned:** {len(st.session_state.user_progress.get('certificates', []))}")
+        st.write(f"**Questions Due for Review:** {due_count(review_state(st.session_state.user_progress))}")
         
         # Student info
         if st.session_state.user_progress['student_name_set']:
@@ -600,7 +570,7 @@ def main():
     else:
         # Full app experience when name is set
         # *** MODIFIED: Changed last tab name ***
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏠 Home", "📚 Courses", "🎯 Study", "📊 Progress", "🎓 Exams & Certificates"])
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🏠 Home", "📚 Courses", "🎯 Study", "📊 Progress", "🎓 Exams & Certificates", "🔁 Review"])
 
         with tab1:
             st.header(f"Welcome, {st.session_state.user_progress['student_name']}! 👋")
@@ -639,6 +609,7 @@ def main():
                                      use_container_width=True):
                             st.session_state.user_progress['current_course'] = course_id
                             st.session_state.user_progress['current_lesson'] = i
+                            mark_progress_changed()
                             # Switch to study tab (This is an improvement, but st.tabs doesn't support programmatic switching. st.rerun() is the best we can do)
                             st.rerun()
 
@@ -675,6 +646,7 @@ def main():
                 if not is_video_watched:
                     if st.button("Mark Video as Watched", type="primary"):
                         st.session_state.user_progress['watched_videos'].append(video_watched_key)
+                        mark_progress_changed()
                         st.rerun()
                 
                 # Lesson content
@@ -699,15 +671,15 @@ def main():
                         for i, q in enumerate(lesson['quiz']['questions']):
                             st.write(f"**Q{i+1}: {q['question']}**")
                             answer = st.radio(f"Select your answer:", q['options'], key=f"quiz_{quiz_key}_{i}")
-                            user_answers.append((q['options'].index(answer), q['correct']))
+                            user_answers.append(q['options'].index(answer))
                         
                         if st.button("Submit Quiz", type="primary"):
-                            correct_answers = sum(1 for user_ans, correct_ans in user_answers if user_ans == correct_ans)
-                            total_questions = len(lesson['quiz']['questions'])
-                            quiz_score = (correct_answers / total_questions) * 100
+                            quiz_score = platform.grade_quiz(lesson['quiz']['questions'], user_answers)
+                            platform.record_review_answers(st.session_state.user_progress, course_id, lesson['id'], lesson['quiz']['questions'], user_answers)
                             
                             # Store the score regardless
                             st.session_state.user_progress['quiz_scores'][quiz_key] = quiz_score
+                            platform.record_quiz_attempt(st.session_state.user_progress, quiz_score)
                             
                             if quiz_score >= 50:
                                 if platform.mark_lesson_completed(course_id, lesson['id'], st.session_state.user_progress):
@@ -735,14 +707,17 @@ def main():
                 with col1:
                     if lesson_index > 0 and st.button("← Previous Lesson"):
                         st.session_state.user_progress['current_lesson'] = lesson_index - 1
+                        mark_progress_changed()
                         st.rerun()
                 with col2:
                     if st.button("🏠 Back to Courses"):
                         st.session_state.user_progress['current_course'] = None
+                        mark_progress_changed()
                         st.rerun()
                 with col3:
                     if lesson_index < len(course['lessons']) - 1 and st.button("Next Lesson →"):
                         st.session_state.user_progress['current_lesson'] = lesson_index + 1
+                        mark_progress_changed()
                         st.rerun()
             else:
                 st.info("Select a lesson from the Courses tab to start studying!")
@@ -782,6 +757,33 @@ def main():
                     <p>{completed}/{total} lessons ({progress_pct:.1f}%)</p>
                     """, unsafe_allow_html=True)
 
+                # Activity timeline, read from pre-aggregated buckets
+                st.subheader("📈 Your Activity")
+                activity = learner_activity(st.session_state.user_progress)
+                rows, granularity = activity_series(activity)
+                display_activity_charts(rows, granularity, "learner")
+                if activity['time_to_certificate']:
+                    course_ids = list(activity['time_to_certificate'])
+                    fig = go.Figure(go.Bar(
+                        x=[platform.courses[c]['title'] if c in platform.courses else c for c in course_ids],
+                        y=[activity['time_to_certificate'][c] for c in course_ids],
+                        marker_color="#28a745"
+                    ))
+                    fig.update_layout(title="Days from First Lesson to Certificate", yaxis_title="Days")
+                    st.plotly_chart(fig, use_container_width=True, key="learner_time_to_certificate")
+
+                if store:
+                    st.subheader("👥 Cohort Activity")
+                    rows, granularity = activity_series(store.activity_buckets(tenant.tenant_id))
+                    display_activity_charts(rows, granularity, "cohort")
+                    certificate_rows = [row for row in rows if row['avg_days_to_certificate'] is not None]
+                    if certificate_rows:
+                        fig = px.line(
+                            pd.DataFrame(certificate_rows), x='period', y='avg_days_to_certificate', markers=True,
+                            title="Average Days to Certificate", labels={'period': '', 'avg_days_to_certificate': 'Days'}
+                        )
+                        st.plotly_chart(fig, use_container_width=True, key="cohort_time_to_certificate")
+
         # *** NEW: Rebuilt Tab 5 for Exams & Certificates ***
         with tab5:
             st.header("🎓 Exams & Certificates")
@@ -790,6 +792,41 @@ def main():
             
             if not platform.courses:
                 st.info("No courses are available yet.")
+
+            # Transcript of every course, score and certificate
+            if st.session_state.user_progress['completed_lessons'] or certificates:
+                catalog_version = catalog_cache.version if catalog_cache else 0
+                safe_name = st.session_state.user_progress['student_name'].replace(' ', '_')
+                col1, col2 = st.columns(2)
+                # Transcripts are built only when asked for, not on every rerun
+                with col1:
+                    if st.button("📜 Prepare Transcript (PDF)", key="transcript_pdf"):
+                        st.markdown(
+                            platform.certificate_generator.get_pdf_download_link(
+                                render_transcript(platform, tenant, 'pdf', store, catalog_version),
+                                f"Transcript_{safe_name}.pdf", label="📜 Download Transcript (PDF)"
+                            ),
+                            unsafe_allow_html=True
+                        )
+                with col2:
+                    if st.button("🗂️ Prepare Transcript (ZIP)", key="transcript_zip"):
+                        st.markdown(
+                            platform.certificate_generator.get_zip_download_link(
+                                render_transcript(platform, tenant, 'zip', store, catalog_version),
+                                f"Transcript_{safe_name}.zip", label="🗂️ Download Transcript (ZIP)"
+                            ),
+                            unsafe_allow_html=True
+                        )
+
+            # All certificates in one printable PDF
+            if len(certificates) > 1:
+                bundle_pdf = platform.certificate_generator.generate_certificate_bundle_pdf(
+                    certificates, organization_name=tenant.organization_name, template=tenant.certificate_template
+                )
+                st.markdown(
+                    platform.certificate_generator.get_pdf_download_link(bundle_pdf, "All_Certificates.pdf", label="📚 Download All Certificates (PDF)"),
+                    unsafe_allow_html=True
+                )
                 
             for course_id, course in platform.courses.items():
                 st.markdown("---")
@@ -808,7 +845,7 @@ def main():
                         # Display the HTML preview
                         st.markdown(f"""
                         <div class="certificate-container">
-                            <div style="font-size: 1.5rem; font-weight: bold; color: white; margin-bottom: 1rem;">OPENFRAUDLABS</div>
+                            <div style="font-size: 1.5rem; font-weight: bold; color: white; margin-bottom: 1rem;">{tenant.organization_name}</div>
                             <div style="font-size: 2.5rem; font-weight: bold; color: #FFD700; margin-bottom: 1rem;">CERTIFICATE OF COMPLETION</div>
                             <div style="font-size: 1.2rem; margin-bottom: 1rem;">This certifies that</div>
                             <div style="font-size: 2rem; font-weight: bold; color: #FFD700; margin: 1rem 0; text-decoration: underline;">{cert['student_name']}</div>
@@ -822,17 +859,31 @@ def main():
                     
                     with col2:
                         # Generate and offer download
-                        cert_image = platform.certificate_generator.generate_certificate_image(
+                        cert_image = render_certificate(
+                            platform.certificate_generator,
+                            cert,
+                            tenant,
+                            "png",
+                            store,
+                            catalog_cache.version if catalog_cache else 0
+                        )
+                        st.image(cert_image, use_column_width=True, caption="Your Official Certificate")
+                        download_filename = f"Certificate_{cert['course_name'].replace(' ', '_')}.png"
+                        st.markdown(
+                            platform.certificate_generator.get_certificate_download_link(cert_image, download_filename),
+                            unsafe_allow_html=True
+                        )
+                        # Vector PDF version for printing
+                        cert_pdf = platform.certificate_generator.generate_certificate_pdf(
                             cert['student_name'],
                             cert['course_name'],
                             cert['completion_date'],
                             cert['score'],
-                            organization_name="OPENFRAUDLABS"
+                            organization_name=tenant.organization_name,
+                            template=tenant.certificate_template
                         )
-                        st.image(cert_image, use_column_width=True, caption="Your Official Certificate")
-                        download_filename = f"Certificate_{cert['course_name'].replace(' ', '_')}.png"
                         st.markdown(
-                            platform.certificate_generator.get_certificate_download_link(cert_image, download_filename),
+                            platform.certificate_generator.get_pdf_download_link(cert_pdf, download_filename[:-4] + ".pdf"),
                             unsafe_allow_html=True
                         )
 
@@ -851,16 +902,16 @@ def main():
                             for i, q in enumerate(final_quiz_data['questions']):
                                 st.write(f"**Q{i+1}: {q['question']}**")
                                 answer = st.radio(f"Select your answer:", q['options'], key=f"final_quiz_{course_id}_{i}")
-                                final_user_answers.append((q['options'].index(answer), q['correct']))
+                                final_user_answers.append(q['options'].index(answer))
                             
                             submitted = st.form_submit_button("Submit Final Exam", type="primary")
                         
                             if submitted:
-                                correct_answers = sum(1 for user_ans, correct_ans in final_user_answers if user_ans == correct_ans)
-                                total_questions = len(final_quiz_data['questions'])
-                                score = (correct_answers / total_questions) * 100
+                                score = platform.grade_quiz(final_quiz_data['questions'], final_user_answers)
+                                platform.record_review_answers(st.session_state.user_progress, course_id, 'final', final_quiz_data['questions'], final_user_answers)
                                 
                                 st.session_state.user_progress['final_quiz_scores'][final_quiz_key] = score
+                                platform.record_quiz_attempt(st.session_state.user_progress, score)
                                 
                                 if score >= course['certificate_threshold']:
                                     st.balloons()
@@ -889,6 +940,55 @@ def main():
                     progress_pct = (completed / total) * 100
                     st.progress(progress_pct / 100, text=f"{completed}/{total} lessons completed")
 
+        with tab6:
+            st.header("🔁 Review")
+            review = review_state(st.session_state.user_progress)
+
+            # Result of the previous answer
+            feedback = st.session_state.pop('review_feedback', None)
+            if feedback:
+                was_correct, correct_option = feedback
+                if was_correct:
+                    st.success("✅ Correct! This question will come back later.")
+                else:
+                    st.error(f"❌ The answer was: {correct_option}. You'll see this question again soon.")
+
+            key = next_due(review)
+            # Drop cards whose question is no longer in the catalog, or was edited since it was answered
+            while key and platform.review_question(key) is None:
+                forget(review, key)
+                mark_progress_changed()
+                key = next_due(review)
+
+            if key is None:
+                if not review['cards']:
+                    st.info("Answer lesson quizzes and final exams to build your review queue.")
+                else:
+                    next_time = next_review_time(review)
+                    st.success("🎉 You're all caught up!")
+                    if next_time:
+                        st.write(f"Next review: {datetime.fromtimestamp(next_time).strftime('%B %d, %Y at %H:%M')}")
+            else:
+                course, source, question = platform.review_question(key)
+                card = review['cards'][key]
+                st.write(f"**{due_count(review)} question(s) due** • {course['title']} — {source}")
+                st.caption(f"Answered correctly {card['correct']} of {card['attempts']} time(s)")
+                with st.form("review_form"):
+                    st.write(f"**{question['question']}**")
+                    answer = st.radio("Select your answer:", question['options'], key=f"review_{key}_{card['seq']}")
+                    submitted = st.form_submit_button("Check Answer", type="primary")
+
+                    if submitted:
+                        correct = question['options'].index(answer) == question['correct']
+                        record_answer(review, key, correct)
+                        mark_progress_changed()
+                        st.session_state.review_feedback = (correct, question['options'][question['correct']])
+                        st.rerun()
+
+    # Changes made in a run that ended without st.rerun() are saved here rather than on the next interaction
+    if store:
+        sync_shared_progress(store, tenant)
+
 
 if __name__ == "__main__":
     main()
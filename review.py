@@ -0,0 +1,156 @@
+"""Spaced-repetition review queue built from quiz and final exam answers.
+
+Every answered question becomes a card with an SM-2 style interval: correct answers
+push the next review further out, wrong ones make the card due immediately. Cards
+wait in a heap keyed by due time; once due they move to a second heap of ready
+cards whose live size is kept as a counter, so the sidebar's due count is O(1)
+and enqueue/dequeue are O(log n). Rescheduling leaves the old heap entry behind
+and bumps the card's sequence number, so stale entries are skipped when popped.
+
+State is plain lists and dicts inside user progress, so it survives JSON.
+"""
+import hashlib
+import heapq
+import json
+import time
+
+DAY = 86400
+MIN_EASE = 1.3
+MAX_EASE = 3.0
+
+
+def new_review_state():
+    return {'cards': {}, 'upcoming': [], 'ready': [], 'due_count': 0, 'seq': 0}
+
+
+def review_state(user_progress):
+    """The learner's review state, created on first use"""
+    state = user_progress.get('review')
+    if state is None:
+        state = user_progress['review'] = new_review_state()
+    return state
+
+
+def question_key(course_id, lesson_id, question):
+    """Card key for a lesson quiz question, or a final exam question with lesson_id 'final'
+
+    The key ends in a digest of the question text and options rather than the
+    question's position, so reordering a quiz keeps each card on its question and
+    editing a question retires its card instead of attaching it to another one.
+    """
+    content = json.dumps([question['question'], question['options']], ensure_ascii=False)
+    return f"{course_id}:{lesson_id}:{hashlib.sha256(content.encode()).hexdigest()[:16]}"
+
+
+def _is_live(state, entry):
+    card = state['cards'].get(entry[2])
+    return card is not None and card['seq'] == entry[1]
+
+
+def _compact(state):
+    """Drop stale heap entries once they outnumber the cards"""
+    if len(state['upcoming']) + len(state['ready']) <= 2 * len(state['cards']) + 16:
+        return
+    for queue in ('upcoming', 'ready'):
+        state[queue] = [entry for entry in state[queue] if _is_live(state, entry)]
+        heapq.heapify(state[queue])
+
+
+def record_answer(state, key, correct, now=None):
+    """Update a card's recall and reschedule it; O(log n)"""
+    now = now or time.time()
+    card = state['cards'].get(key)
+    if card is None:
+        card = state['cards'][key] = {
+            'interval': 0, 'ease': 2.5, 'reps': 0, 'attempts': 0, 'correct': 0, 'due': now, 'seq': 0, 'ready': False
+        }
+    card['attempts'] += 1
+    if correct:
+        card['correct'] += 1
+        card['reps'] += 1
+        card['interval'] = 1 if card['reps'] == 1 else 3 if card['reps'] == 2 else round(card['interval'] * card['ease'], 1)
+        card['ease'] = min(MAX_EASE, card['ease'] + 0.1)
+    else:
+        card['reps'] = 0
+        card['interval'] = 0
+        card['ease'] = max(MIN_EASE, card['ease'] - 0.2)
+
+    # The card's previous heap entry becomes stale; it no longer counts as due
+    if card['ready']:
+        state['due_count'] -= 1
+        card['ready'] = False
+    state['seq'] += 1
+    card['seq'] = state['seq']
+    card['due'] = now + card['interval'] * DAY
+    heapq.heappush(state['upcoming'], [card['due'], card['seq'], key])
+    _compact(state)
+
+
+def advance(state, now=None):
+    """Move cards that have come due into the ready heap; O(1) when none have"""
+    now = now or time.time()
+    upcoming = state['upcoming']
+    while upcoming and upcoming[0][0] <= now:
+        entry = heapq.heappop(upcoming)
+        if _is_live(state, entry):
+            state['cards'][entry[2]]['ready'] = True
+            heapq.heappush(state['ready'], entry)
+            state['due_count'] += 1
+
+
+def due_count(state, now=None):
+    """Number of cards due for review"""
+    advance(state, now)
+    return state['due_count']
+
+
+def next_due(state, now=None):
+    """Key of the most overdue card, or None; stale entries are discarded on the way"""
+    advance(state, now)
+    ready = state['ready']
+    while ready and not _is_live(state, ready[0]):
+        heapq.heappop(ready)
+    return ready[0][2] if ready else None
+
+
+def next_review_time(state):
+    """When the next upcoming card comes due, or None"""
+    upcoming = state['upcoming']
+    while upcoming and not _is_live(state, upcoming[0]):
+        heapq.heappop(upcoming)
+    return upcoming[0][0] if upcoming else None
+
+
+def forget(state, key):
+    """Remove a card, e.g. when its question left the catalog"""
+    card = state['cards'].pop(key, None)
+    if card and card['ready']:
+        state['due_count'] -= 1
+
+
+def prune(state, keep):
+    """Forget every card whose key is not in keep; returns how many were dropped"""
+    gone = [key for key in state['cards'] if key not in keep]
+    for key in gone:
+        forget(state, key)
+    return len(gone)
+
+
+def rebuild_review_state(cards):
+    """A fresh state holding copies of cards, with heaps and due count rebuilt from their due times"""
+    state = new_review_state()
+    for key, card in cards.items():
+        state['seq'] += 1
+        state['cards'][key] = dict(card, seq=state['seq'], ready=False)
+        state['upcoming'].append([card['due'], state['seq'], key])
+    heapq.heapify(state['upcoming'])
+    return state
+
+
+def merge_review_states(first, second):
+    """Combine two sessions' review states, keeping each card's copy with more answers"""
+    cards = dict(first['cards'])
+    for key, card in second['cards'].items():
+        if key not in cards or card['attempts'] > cards[key]['attempts']:
+            cards[key] = card
+    return rebuild_review_state(cards)
@@ -0,0 +1,321 @@
+"""Shared state for running several app processes on one machine.
+
+Point every process at the same SQLite file and put them behind a local load
+balancer (with sticky sessions, since Streamlit keeps a websocket per session):
+
+    LEARNING_PLATFORM_DB=/var/lib/learning/shared.db streamlit run learning_platform.py --server.port 8501
+    LEARNING_PLATFORM_DB=/var/lib/learning/shared.db streamlit run learning_platform.py --server.port 8502
+
+Learner progress, course catalogs and rendered certificates then live in the
+database instead of one process's memory, each namespaced by tenant. App processes
+only seed a tenant's catalog when none exists; publishing a new one
+(``python course_catalog.py`` with LEARNING_PLATFORM_DB set) bumps that tenant's
+version and clears its certificate cache, and every process notices the new
+version on its next rerun and reloads.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from activity import GRANULARITIES, METRICS, bucket_keys, merge_activity
+from review import merge_review_states
+
+DB_PATH_ENV = "LEARNING_PLATFORM_DB"
+
+
+class SharedStore:
+    def __init__(self, path):
+        self.path = path
+        # Streamlit runs each session on its own thread and sqlite3 connections can't be shared
+        self._local = threading.local()
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS learners (
+                learner_id TEXT PRIMARY KEY,
+                progress TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                revision INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS catalog (
+                tenant_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                payload BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS certificate_cache (
+                tenant_id TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (tenant_id, cache_key)
+            );
+            CREATE TABLE IF NOT EXISTS activity_buckets (
+                tenant_id TEXT NOT NULL,
+                granularity TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                lessons INTEGER NOT NULL DEFAULT 0,
+                quiz_sum REAL NOT NULL DEFAULT 0,
+                quiz_count INTEGER NOT NULL DEFAULT 0,
+                certificates INTEGER NOT NULL DEFAULT 0,
+                certificate_days REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (tenant_id, granularity, bucket)
+            );
+        """)
+        columns = [row[1] for row in self._connection().execute("PRAGMA table_info(learners)")]
+        if 'revision' not in columns:
+            # Stores created before saves were revision-checked
+            self._connection().execute("ALTER TABLE learners ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # WAL lets readers in other processes carry on while one process writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Learner progress
+
+    def load_progress(self, learner_id):
+        """Stored progress for a learner (ids are namespaced by tenant), or None if they have none yet"""
+        return self.load_progress_record(learner_id)[0]
+
+    def load_progress_record(self, learner_id):
+        """A learner's stored (progress, revision), or (None, 0)"""
+        row = self._connection().execute(
+            "SELECT progress, revision FROM learners WHERE learner_id = ?", (learner_id,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, 0)
+
+    def save_progress(self, learner_id, progress, expected_revision=None):
+        """Store a learner's progress dict; returns the new revision.
+
+        With expected_revision the write only happens if the stored revision still
+        matches (0 meaning no record yet), and None is returned when another session
+        saved in between. Without it the record is overwritten.
+        """
+        conn = self._connection()
+        data, now = json.dumps(progress), time.time()
+        if expected_revision is None:
+            conn.execute(
+                "INSERT INTO learners (learner_id, progress, updated_at, revision) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (learner_id) DO UPDATE SET progress = excluded.progress, "
+                "updated_at = excluded.updated_at, revision = revision + 1",
+                (learner_id, data, now)
+            )
+            return conn.execute("SELECT revision FROM learners WHERE learner_id = ?", (learner_id,)).fetchone()[0]
+        if expected_revision == 0:
+            cursor = conn.execute(
+                "INSERT INTO learners (learner_id, progress, updated_at, revision) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (learner_id) DO UPDATE SET progress = excluded.progress, "
+                "updated_at = excluded.updated_at, revision = 1 WHERE revision = 0",
+                (learner_id, data, now)
+            )
+        else:
+            cursor = conn.execute(
+                "UPDATE learners SET progress = ?, updated_at = ?, revision = revision + 1 WHERE learner_id = ? AND revision = ?",
+                (data, now, learner_id, expected_revision)
+            )
+        return expected_revision + 1 if cursor.rowcount == 1 else None
+
+    def learners(self, tenant_id):
+        """(learner_id, student_name) for every learner with stored progress in a tenant, in id order"""
+        # A range on the primary key instead of LIKE, so the index is used and ids need no escaping
+        rows = self._connection().execute(
+            "SELECT learner_id, json_extract(progress, '$.student_name') FROM learners "
+            "WHERE learner_id >= ? AND learner_id < ? ORDER BY learner_id",
+            (f"{tenant_id}/", f"{tenant_id}0")
+        )
+        return [(learner_id, name or "") for learner_id, name in rows]
+
+    # Course catalog
+
+    def catalog_version(self, tenant_id):
+        """Current catalog version for a tenant, 0 if none has been published"""
+        row = self._connection().execute("SELECT version FROM catalog WHERE tenant_id = ?", (tenant_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load_catalog(self, tenant_id):
+        """A tenant's published catalog as (version, catalog), or (0, None)"""
+        version, catalog, _ = self.load_catalog_record(tenant_id)
+        return version, catalog
+
+    def load_catalog_record(self, tenant_id):
+        """A tenant's published catalog as (version, catalog, pickled size in bytes), or (0, None, 0)"""
+        row = self._connection().execute(
+            "SELECT version, payload FROM catalog WHERE tenant_id = ?", (tenant_id,)
+        ).fetchone()
+        return (row[0], pickle.loads(row[1]), len(row[1])) if row else (0, None, 0)
+
+    def publish_catalog(self, tenant_id, catalog, replace=True):
+        """Publish a tenant's catalog if it differs from the stored one; returns the current version.
+
+        With replace=False an existing catalog is kept whatever it contains, so only
+        the first publisher sets it.
+        """
+        payload = pickle.dumps(catalog, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(payload).hexdigest()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT version, digest FROM catalog WHERE tenant_id = ?", (tenant_id,)).fetchone()
+            if row and (row[1] == digest or not replace):
+                conn.execute("COMMIT")
+                return row[0]
+            version = (row[0] if row else 0) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO catalog (tenant_id, version, digest, payload) VALUES (?, ?, ?, ?)",
+                (tenant_id, version, digest, payload)
+            )
+            # Certificates show course titles, so renders from the old catalog are stale
+            conn.execute("DELETE FROM certificate_cache WHERE tenant_id = ?", (tenant_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    # Rendered certificates
+
+    def get_certificate(self, tenant_id, cache_key):
+        """Cached certificate bytes, or None"""
+        row = self._connection().execute(
+            "SELECT data FROM certificate_cache WHERE tenant_id = ? AND cache_key = ?", (tenant_id, cache_key)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_certificate(self, tenant_id, cache_key, data, quota_bytes=None):
+        """Cache rendered certificate bytes for every process, trimming the tenant's oldest renders past its quota"""
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO certificate_cache (tenant_id, cache_key, data, created_at) VALUES (?, ?, ?, ?)",
+            (tenant_id, cache_key, data, time.time())
+        )
+        if quota_bytes is None:
+            return
+        used = conn.execute(
+            "SELECT COALESCE(SUM(length(data)), 0) FROM certificate_cache WHERE tenant_id = ?", (tenant_id,)
+        ).fetchone()[0]
+        if used > quota_bytes:
+            # Keep the newest renders that fit the quota; other tenants' rows are untouched
+            conn.execute("""
+                DELETE FROM certificate_cache WHERE tenant_id = ? AND cache_key NOT IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key, SUM(length(data)) OVER (ORDER BY created_at DESC) AS running
+                        FROM certificate_cache WHERE tenant_id = ?
+                    ) WHERE running <= ?
+                )
+            """, (tenant_id, tenant_id, quota_bytes))
+
+
+    # Cohort activity
+
+    def record_activity(self, tenant_id, when, amounts):
+        """Add a learner event's amounts to the tenant cohort's daily and weekly buckets"""
+        assignments = ", ".join(f"{metric} = {metric} + excluded.{metric}" for metric in amounts)
+        columns = ", ".join(amounts)
+        placeholders = ", ".join("?" for _ in amounts)
+        conn = self._connection()
+        for granularity, key in bucket_keys(when).items():
+            conn.execute(
+                f"INSERT INTO activity_buckets (tenant_id, granularity, bucket, {columns}) VALUES (?, ?, ?, {placeholders}) "
+                f"ON CONFLICT (tenant_id, granularity, bucket) DO UPDATE SET {assignments}",
+                (tenant_id, granularity, key, *amounts.values())
+            )
+
+    def activity_buckets(self, tenant_id):
+        """A tenant cohort's buckets as {granularity: {bucket: metrics}}, the shape activity_series reads"""
+        buckets = {granularity: {} for granularity in GRANULARITIES}
+        rows = self._connection().execute(
+            f"SELECT granularity, bucket, {', '.join(METRICS)} FROM activity_buckets WHERE tenant_id = ?", (tenant_id,)
+        )
+        for granularity, bucket, *values in rows:
+            buckets[granularity][bucket] = dict(zip(METRICS, values))
+        return buckets
+
+
+class CatalogCache:
+    """Per-process copy of a tenant's shared catalog, reloaded only when its version changes"""
+
+    def __init__(self, store, tenant_id):
+        self.store = store
+        self.tenant_id = tenant_id
+        self.version = None
+        self.catalog = None
+        self.size_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self):
+        """The current catalog; costs one indexed read when nothing changed"""
+        version = self.store.catalog_version(self.tenant_id)
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.version, self.catalog, self.size_bytes = self.store.load_catalog_record(self.tenant_id)
+        return self.catalog
+
+
+def _union(first, second, key=lambda item: item):
+    seen = {key(item) for item in first}
+    return list(first) + [item for item in second if key(item) not in seen]
+
+
+def merge_progress(stored, local):
+    """Combine a learner's stored progress with a session's copy written from an older revision.
+
+    Completions, certificates, achievements and watched videos are united, scores
+    keep their best value, activity and review cards are merged, and everything
+    else (name, current lesson) comes from the session.
+    """
+    merged = dict(stored)
+    merged.update(local)
+    merged['completed_lessons'] = _union(
+        stored.get('completed_lessons', []), local.get('completed_lessons', []), lambda l: (l['course'], l['id'])
+    )
+    # A certificate keeps the id and date it was first awarded with
+    merged['certificates'] = _union(stored.get('certificates', []), local.get('certificates', []), lambda c: c['course_id'])
+    for field in ('achievements', 'watched_videos'):
+        merged[field] = _union(stored.get(field, []), local.get(field, []))
+    for field in ('quiz_scores', 'final_quiz_scores'):
+        scores = dict(stored.get(field, {}))
+        for key, score in local.get(field, {}).items():
+            scores[key] = max(score, scores.get(key, score))
+        merged[field] = scores
+    if 'activity' in stored and 'activity' in local:
+        merged['activity'] = merge_activity(stored['activity'], local['activity'])
+    if 'review' in stored and 'review' in local:
+        merged['review'] = merge_review_states(stored['review'], local['review'])
+    return merged
+
+
+def save_merged_progress(store, learner_id, progress, revision):
+    """Save progress a session read at revision, merging in whatever other sessions saved since.
+
+    Returns (progress, revision) as stored; the progress is a new dict when a merge happened.
+    """
+    while True:
+        new_revision = store.save_progress(learner_id, progress, revision)
+        if new_revision is not None:
+            return progress, new_revision
+        stored, revision = store.load_progress_record(learner_id)
+        progress = merge_progress(stored, progress)
+
+
+def certificate_cache_key(cert, organization_name, template, catalog_version, fmt="png"):
+    """Cache key for one rendered certificate"""
+    parts = [
+        fmt, template, organization_name, str(catalog_version),
+        cert['student_name'], cert['course_name'], cert['completion_date'], str(cert.get('score'))
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def open_shared_store():
+    """The shared store configured through LEARNING_PLATFORM_DB, or None for single-process mode"""
+    path = os.environ.get(DB_PATH_ENV)
+    return SharedStore(path) if path else None
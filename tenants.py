@@ -0,0 +1,154 @@
+"""Client organizations (tenants) and their per-tenant cache shards.
+
+Each tenant has its own branding, course catalog, certificate templates and
+progress namespace. Add a client by adding an entry to TENANTS (and, for its own
+courses, a data module compiled with ``python course_catalog.py --data-module``).
+Requests pick a tenant with ``?tenant=<id>``; LEARNING_PLATFORM_TENANT sets the
+default. A client with its own courses and certificate style looks like:
+
+    'acme': {
+        'organization_name': "ACME CREDIT UNION",
+        'catalog_module': "acme_courses",
+        'catalog_artifact': "catalog-acme.pkl",
+        'certificate_template': 'modern',
+        'cache_quota_mb': 32
+    },
+"""
+from collections import OrderedDict
+import os
+import threading
+
+DEFAULT_TENANT_ENV = "LEARNING_PLATFORM_TENANT"
+
+TENANTS = {
+    'openfraudlabs': {
+        'organization_name': "OPENFRAUDLABS",
+        'app_name': "FinanceMaster",
+        'tagline': "Personal Finance Education Platform",
+        'catalog_module': "course_data",
+        'catalog_artifact': "catalog.pkl",
+        'certificate_template': 'basic',
+        'certificate_templates': None,  # None uses CertificateGenerator's built-in templates
+        'cache_quota_mb': 64
+    },
+}
+
+
+class Tenant:
+    def __init__(self, tenant_id, organization_name, app_name="FinanceMaster", tagline="Personal Finance Education Platform",
+                 catalog_module="course_data", catalog_artifact=None, certificate_template='basic',
+                 certificate_templates=None, cache_quota_mb=64):
+        self.tenant_id = tenant_id
+        self.organization_name = organization_name
+        self.app_name = app_name
+        self.tagline = tagline
+        self.catalog_module = catalog_module
+        self.catalog_artifact = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), catalog_artifact or f"catalog-{tenant_id}.pkl"
+        )
+        self.certificate_template = certificate_template
+        self.certificate_templates = certificate_templates
+        self.cache_quota_bytes = int(cache_quota_mb * 1024 * 1024)
+
+
+TENANT_REGISTRY = {tenant_id: Tenant(tenant_id, **config) for tenant_id, config in TENANTS.items()}
+
+
+def resolve_tenant(tenant_id=None):
+    """The tenant for a request: one dict lookup, falling back to the default tenant"""
+    tenant = TENANT_REGISTRY.get(tenant_id) if tenant_id else None
+    if tenant is None:
+        tenant = TENANT_REGISTRY.get(os.environ.get(DEFAULT_TENANT_ENV)) or next(iter(TENANT_REGISTRY.values()))
+    return tenant
+
+
+class LRUShard:
+    """A byte-bounded cache holding one tenant's entries.
+
+    Long-lived per-tenant state (catalog, certificate generator) sits in a pinned
+    slot that counts against the quota but is never evicted; the rest of the quota
+    is an LRU of rendered content.
+    """
+
+    def __init__(self, quota_bytes):
+        self.quota_bytes = quota_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.used_bytes = 0
+        self.pinned = {}  # key -> (value, size)
+        self.pinned_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _evict(self, needed):
+        while self.entries and self.pinned_bytes + self.used_bytes + needed > self.quota_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.used_bytes -= evicted_size
+            self.evictions += 1
+
+    def put(self, key, value, size):
+        """Cache value, evicting this shard's least recently used entries to stay within quota"""
+        with self.lock:
+            if self.pinned_bytes + size > self.quota_bytes:
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old[1]
+            self._evict(size)
+            self.entries[key] = (value, size)
+            self.used_bytes += size
+
+    def get_pinned(self, key):
+        with self.lock:
+            entry = self.pinned.get(key)
+            return entry[0] if entry else None
+
+    def pin(self, key, value, size):
+        """Keep value in the pinned slot, re-counting its size; LRU entries make room for it"""
+        with self.lock:
+            old = self.pinned.pop(key, None)
+            if old is not None:
+                self.pinned_bytes -= old[1]
+            self.pinned[key] = (value, size)
+            self.pinned_bytes += size
+            self._evict(0)
+
+
+class TenantCaches:
+    """One shard per tenant, so a large tenant can only evict its own entries"""
+
+    def __init__(self, tenants=None):
+        tenants = tenants or TENANT_REGISTRY
+        self.shards = {tenant_id: LRUShard(tenant.cache_quota_bytes) for tenant_id, tenant in tenants.items()}
+
+    def shard(self, tenant_id):
+        return self.shards[tenant_id]
+
+    def get_or_create(self, tenant_id, key, factory, size_of=len):
+        """Cached value for key in the tenant's LRU, created with factory() on a miss"""
+        shard = self.shards[tenant_id]
+        value = shard.get(key)
+        if value is None:
+            value = factory()
+            shard.put(key, value, size_of(value))
+        return value
+
+    def pinned(self, tenant_id, key, factory, size_of=len):
+        """Value for key in the tenant's pinned slot, created with factory() the first time"""
+        shard = self.shards[tenant_id]
+        value = shard.get_pinned(key)
+        if value is None:
+            value = factory()
+            shard.pin(key, value, size_of(value))
+        return value
@@ -0,0 +1,399 @@
+"""Learner transcripts: every course, quiz score, final exam and certificate in one document.
+
+    python transcripts.py --output transcripts/                  # a PDF per learner in the shared store
+    python transcripts.py --output transcripts/ --format zip     # certificate PNGs plus a summary, per learner
+    python transcripts.py --output transcripts/ --tenant acme -p 8
+    python transcripts.py --output transcripts/ --bundle         # every learner's certificates in one PDF
+
+A PDF transcript opens with summary pages and follows them with one page per
+certificate; a ZIP transcript holds the certificate PNGs next to summary.pdf and
+transcript.csv. Both are written to their stream page by page and file by file,
+taking certificate renders from the caller's cache when it has one. Cohort
+exports read learners from the shared store (LEARNING_PLATFORM_DB) and render
+them across worker processes; --bundle instead streams every certificate in the
+cohort into a single printable PDF.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import sys
+import time
+import zipfile
+from datetime import datetime
+
+from certificates import (
+    PDF_RASTER_SCALE, CertificateGenerator, PDFWriter, encode_pdf_text, pdf_can_encode, pdf_stencil_ops, pdf_text_ops,
+    pdf_text_width
+)
+from course_catalog import load_catalog
+from shared_store import DB_PATH_ENV, SharedStore, certificate_cache_key
+from tenants import TENANT_REGISTRY, resolve_tenant
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter, in points
+MARGIN = 54
+LINE_SPACING = 1.5
+SCORE_COLUMN = 70  # Width kept free for right-aligned scores
+
+INK = (33, 33, 33)
+MUTED = (110, 110, 110)
+ACCENT = (31, 119, 180)
+
+
+def transcript_rows(catalog, user_progress):
+    """One entry per course the learner has started, in catalog order"""
+    completed = {}
+    for lesson in user_progress.get('completed_lessons', []):
+        completed.setdefault(lesson['course'], set()).add(lesson['id'])
+    quiz_scores = user_progress.get('quiz_scores', {})
+    final_scores = user_progress.get('final_quiz_scores', {})
+    certificates = {cert['course_id']: cert for cert in user_progress.get('certificates', [])}
+
+    rows = []
+    for course_id, course in catalog.courses.items():
+        done = completed.get(course_id, set())
+        lessons = [
+            {
+                'title': lesson['title'],
+                'score': quiz_scores.get(f"{course_id}_{lesson['id']}"),
+                'completed': lesson['id'] in done
+            }
+            for lesson in course['lessons']
+        ]
+        taken = [lesson['score'] for lesson in lessons if lesson['score'] is not None]
+        final_score = final_scores.get(f"final_{course_id}")
+        if not (done or taken or final_score is not None or course_id in certificates):
+            continue
+        rows.append({
+            'course_id': course_id,
+            'title': course['title'],
+            'lessons': lessons,
+            'lessons_completed': len(done),
+            'quiz_average': sum(taken) / len(taken) if taken else None,
+            'final_title': course['final_quiz']['title'],
+            'final_score': final_score,
+            'threshold': course['certificate_threshold'],
+            'certificate': certificates.get(course_id)
+        })
+    return rows
+
+
+def _format_score(score):
+    return "-" if score is None else f"{score:.1f}%"
+
+
+def _fit(data, max_width, size, bold=False):
+    """Encoded text, cut short with an ellipsis if it is wider than max_width"""
+    if pdf_text_width(data, size, bold) <= max_width:
+        return data
+    max_width -= pdf_text_width(b"...", size, bold)
+    while data and pdf_text_width(data, size, bold) > max_width:
+        data = data[:-1]
+    return data.rstrip() + b"..."
+
+
+def _text_ops(text, x, baseline, size, max_width, bold=False, color=INK, font_for_size=None):
+    """Operators for one line of text cut to max_width; text Helvetica can't show is stencilled with a TrueType font"""
+    if pdf_can_encode(text) or font_for_size is None:
+        return pdf_text_ops(_fit(encode_pdf_text(text), max_width, size, bold), x, baseline, size, bold, color)
+    font = font_for_size(size * PDF_RASTER_SCALE, bold)
+    limit = max_width * PDF_RASTER_SCALE
+    if font.getlength(text) > limit:
+        while text and font.getlength(text + "…") > limit:
+            text = text[:-1]
+        text = text.rstrip() + "…"
+    ascent = font.getmetrics()[0] / PDF_RASTER_SCALE
+    return pdf_stencil_ops(text, font, x, baseline + ascent, color)
+
+
+def _line(text, right=None, size=10, bold=False, color=INK, indent=0, space_before=0, keep=0):
+    """A summary line; keep reserves room below it so a heading is not left alone at a page bottom"""
+    return {
+        'text': text, 'right': right, 'size': size, 'bold': bold, 'color': color,
+        'indent': indent, 'space_before': space_before, 'keep': keep
+    }
+
+
+def summary_lines(rows, student_name, organization_name, issued):
+    """The transcript summary as a flat list of lines, before pagination"""
+    certified = sum(1 for row in rows if row['certificate'])
+    lessons_completed = sum(row['lessons_completed'] for row in rows)
+    lines = [
+        _line(organization_name, size=18, bold=True, color=ACCENT),
+        _line("Academic Transcript", size=14, bold=True, space_before=4),
+        _line(f"Student: {student_name}", size=11, space_before=8),
+        _line(f"Issued: {issued}", size=11, color=MUTED),
+        _line(f"Courses started: {len(rows)}    Lessons completed: {lessons_completed}    Certificates: {certified}", size=11)
+    ]
+    if not rows:
+        lines.append(_line("No coursework recorded yet.", color=MUTED, space_before=16))
+    for row in rows:
+        heading_keep = 2 * 10 * LINE_SPACING
+        lines.append(_line(
+            row['title'], "Certified" if row['certificate'] else "In progress",
+            size=13, bold=True, color=ACCENT, space_before=16, keep=heading_keep
+        ))
+        lines.append(_line(
+            f"Lessons completed: {row['lessons_completed']} of {len(row['lessons'])}    "
+            f"Lesson quiz average: {_format_score(row['quiz_average'])}",
+            color=MUTED
+        ))
+        for number, lesson in enumerate(row['lessons'], 1):
+            lines.append(_line(f"Lesson {number}: {lesson['title']}", _format_score(lesson['score']), indent=12, space_before=2 if number == 1 else 0))
+        lines.append(_line(f"Final exam: {row['final_title']}", _format_score(row['final_score']), bold=True, indent=12))
+        cert = row['certificate']
+        if cert:
+            lines.append(_line(f"Certificate {cert['certificate_id']}, awarded {cert['completion_date']}", color=MUTED, indent=12))
+    return lines
+
+
+def summary_pages(rows, student_name, organization_name="OPENFRAUDLABS", issued=None, font_for_size=None):
+    """PDF content for the transcript summary, yielded one page at a time.
+
+    font_for_size(size, bold) returns a PIL font for text outside WinAnsi, such as
+    most non-Latin names; without it that text is set in Helvetica with those characters lost.
+    """
+    issued = issued or datetime.now().strftime("%B %d, %Y")
+    footer = f"{organization_name} transcript for {student_name}"
+    right_edge = PAGE_WIDTH - MARGIN
+    page, number, y = None, 0, 0
+
+    for line in summary_lines(rows, student_name, organization_name, issued):
+        height = line['space_before'] + line['size'] * LINE_SPACING
+        if page is None or y - height - line['keep'] < MARGIN:
+            if page is not None:
+                yield b"\n".join(page)
+            number += 1
+            label = encode_pdf_text(f"Page {number}")
+            page = [
+                _text_ops(footer, MARGIN, MARGIN / 2, 8, right_edge - MARGIN - SCORE_COLUMN, color=MUTED, font_for_size=font_for_size),
+                pdf_text_ops(label, right_edge - pdf_text_width(label, 8), MARGIN / 2, 8, fill=MUTED)
+            ]
+            y = PAGE_HEIGHT - MARGIN
+            # No gap above the first line of a page
+            height -= line['space_before']
+        y -= height
+        baseline = y + line['size'] * (LINE_SPACING - 1)
+        left = MARGIN + line['indent']
+        text_width = right_edge - left - (SCORE_COLUMN if line['right'] else 0)
+        page.append(_text_ops(
+            line['text'], left, baseline, line['size'], text_width, line['bold'], line['color'], font_for_size
+        ))
+        if line['right']:
+            right = encode_pdf_text(line['right'])
+            page.append(pdf_text_ops(
+                right, right_edge - pdf_text_width(right, line['size'], line['bold']),
+                baseline, line['size'], line['bold'], line['color']
+            ))
+    yield b"\n".join(page)
+
+
+def _write_summary_csv(rows, stream):
+    writer = csv.writer(stream)
+    writer.writerow(["course", "item", "score", "status", "date"])
+    for row in rows:
+        for number, lesson in enumerate(row['lessons'], 1):
+            writer.writerow([
+                row['title'], f"Lesson {number}: {lesson['title']}", lesson['score'],
+                "completed" if lesson['completed'] else "not completed", ""
+            ])
+        if row['final_score'] is None:
+            status = "not taken"
+        else:
+            status = "passed" if row['final_score'] >= row['threshold'] else "not passed"
+        writer.writerow([row['title'], f"Final exam: {row['final_title']}", row['final_score'], status, ""])
+        cert = row['certificate']
+        if cert:
+            writer.writerow([row['title'], f"Certificate {cert['certificate_id']}", cert['score'], "awarded", cert['completion_date']])
+
+
+def write_transcript_pdf(generator, catalog, user_progress, stream, organization_name="OPENFRAUDLABS", template='basic', certificate_page=None):
+    """Stream a transcript PDF: summary pages, then one page per certificate.
+
+    certificate_page(cert) returns a certificate's page content, e.g. from a cache;
+    by default pages are built with the generator.
+    """
+    if certificate_page is None:
+        def certificate_page(cert):
+            return generator.render_certificate(cert, "pdf-page", organization_name, template)
+
+    rows = transcript_rows(catalog, user_progress)
+    writer = generator.certificate_pdf_writer(stream, template)
+    for content in summary_pages(rows, user_progress.get('student_name', ""), organization_name, font_for_size=generator.text_font):
+        writer.add_page(content, PAGE_WIDTH, PAGE_HEIGHT)
+    # Certificates come from progress, so ones for courses since removed from the catalog are kept
+    for cert in user_progress.get('certificates', []):
+        writer.add_page(certificate_page(cert))
+    writer.close()
+
+
+def write_transcript_zip(generator, catalog, user_progress, stream, organization_name="OPENFRAUDLABS", template='basic', certificate_png=None):
+    """Stream a transcript ZIP: certificate PNGs, summary.pdf and transcript.csv.
+
+    certificate_png(cert) returns a certificate's PNG bytes, e.g. from a cache; by
+    default certificates are rendered with the generator. The stream need not be seekable.
+    """
+    if certificate_png is None:
+        def certificate_png(cert):
+            return generator.render_certificate(cert, "png", organization_name, template)
+
+    rows = transcript_rows(catalog, user_progress)
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for number, cert in enumerate(user_progress.get('certificates', []), 1):
+            # PNGs are already compressed
+            archive.writestr(
+                f"certificates/{number:02d}_{safe_filename(cert['course_name'])}.png",
+                certificate_png(cert),
+                compress_type=zipfile.ZIP_STORED
+            )
+        with archive.open("summary.pdf", 'w') as f:
+            writer = PDFWriter(f, PAGE_WIDTH, PAGE_HEIGHT)
+            for content in summary_pages(rows, user_progress.get('student_name', ""), organization_name, font_for_size=generator.text_font):
+                writer.add_page(content)
+            writer.close()
+        with archive.open("transcript.csv", 'w') as f, io.TextIOWrapper(f, encoding='utf-8', newline='') as text:
+            _write_summary_csv(rows, text)
+
+
+def safe_filename(text):
+    """text reduced to letters, digits and underscores, for use in file names"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_') or "learner"
+
+
+def shared_certificate_render(generator, store, tenant, cert, catalog_version, fmt="png"):
+    """A certificate's PNG bytes or PDF page content ("pdf-page") through the shared store's render cache"""
+    cache_key = certificate_cache_key(cert, tenant.organization_name, tenant.certificate_template, catalog_version, fmt)
+    data = store.get_certificate(tenant.tenant_id, cache_key)
+    if not data:
+        data = generator.render_certificate(cert, fmt, tenant.organization_name, tenant.certificate_template)
+        store.put_certificate(tenant.tenant_id, cache_key, data, tenant.cache_quota_bytes)
+    return data
+
+
+# Cohort export
+
+_worker = {}
+
+
+def _init_worker(db_path, tenant_id):
+    """Open the store and compile the tenant's template once per worker process"""
+    tenant = resolve_tenant(tenant_id)
+    store = SharedStore(db_path)
+    catalog_version, catalog = store.load_catalog(tenant.tenant_id)
+    generator = CertificateGenerator(tenant.certificate_templates)
+    generator.render_plan(tenant.certificate_template)
+    _worker.update(
+        tenant=tenant,
+        store=store,
+        catalog=catalog or load_catalog(tenant.catalog_artifact, tenant.catalog_module),
+        catalog_version=catalog_version,
+        generator=generator
+    )
+
+
+def _export_learner(job):
+    """Write one learner's transcript file; returns its size in bytes"""
+    learner_id, path, fmt = job
+    tenant, store, generator = _worker['tenant'], _worker['store'], _worker['generator']
+    progress = store.load_progress(learner_id)
+    catalog_version = _worker['catalog_version']
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        if fmt == 'zip':
+            write_transcript_zip(
+                generator, _worker['catalog'], progress, f, tenant.organization_name, tenant.certificate_template,
+                certificate_png=lambda cert: shared_certificate_render(generator, store, tenant, cert, catalog_version)
+            )
+        else:
+            write_transcript_pdf(
+                generator, _worker['catalog'], progress, f, tenant.organization_name, tenant.certificate_template,
+                certificate_page=lambda cert: shared_certificate_render(generator, store, tenant, cert, catalog_version, "pdf-page")
+            )
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+def export_cohort(db_path, tenant, output_dir, fmt='pdf', processes=None):
+    """Write a transcript file per learner of a tenant; returns (transcripts written, total bytes)"""
+    learners = SharedStore(db_path).learners(tenant.tenant_id)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for learner_id, student_name in learners:
+        # Names are not unique, so a short hash of the learner's stable id keeps file names apart
+        suffix = hashlib.sha256(learner_id.encode()).hexdigest()[:8]
+        filename = f"Transcript_{safe_filename(student_name)}_{suffix}.{fmt}"
+        jobs.append((learner_id, os.path.join(output_dir, filename), fmt))
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(jobs) <= 1:
+        _init_worker(db_path, tenant.tenant_id)
+        sizes = [_export_learner(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(db_path, tenant.tenant_id)) as pool:
+            sizes = list(pool.imap_unordered(_export_learner, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+    return len(sizes), sum(sizes)
+
+
+def cohort_certificates(store, tenant_id):
+    """Every certificate of a tenant's learners, loading one learner's progress at a time"""
+    for learner_id, _ in store.learners(tenant_id):
+        progress = store.load_progress(learner_id) or {}
+        yield from progress.get('certificates', [])
+
+
+def export_cohort_bundle(db_path, tenant, output_dir):
+    """Write every certificate of a tenant's learners into one PDF; returns (certificates written, bytes)"""
+    store = SharedStore(db_path)
+    generator = CertificateGenerator(tenant.certificate_templates)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"Certificates_{safe_filename(tenant.tenant_id)}.pdf")
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    count = 0
+
+    def counted(certificates):
+        nonlocal count
+        for cert in certificates:
+            count += 1
+            yield cert
+
+    with open(temp_path, 'wb') as f:
+        generator.write_certificates_pdf(
+            counted(cohort_certificates(store, tenant.tenant_id)), f, tenant.organization_name, tenant.certificate_template
+        )
+    os.replace(temp_path, path)
+    return count, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", required=True, help="directory to write transcripts to")
+    parser.add_argument("--format", choices=("pdf", "zip"), default="pdf")
+    parser.add_argument("--db", default=os.environ.get(DB_PATH_ENV), help=f"shared store path (default: ${DB_PATH_ENV})")
+    parser.add_argument("--tenant", help="tenant id (default: the default tenant)")
+    parser.add_argument("-p", "--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--bundle", action="store_true", help="write the cohort's certificates into one PDF instead")
+    args = parser.parse_args()
+
+    if not args.db:
+        print(f"No shared store: pass --db or set {DB_PATH_ENV}", file=sys.stderr)
+        return 2
+    if args.tenant and args.tenant not in TENANT_REGISTRY:
+        print(f"Unknown tenant {args.tenant!r}; known tenants: {', '.join(TENANT_REGISTRY)}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    if args.bundle:
+        count, total_bytes = export_cohort_bundle(args.db, resolve_tenant(args.tenant), args.output)
+        noun = "certificates"
+    else:
+        count, total_bytes = export_cohort(args.db, resolve_tenant(args.tenant), args.output, args.format, args.processes)
+        noun = "transcripts"
+    print(f"{count} {noun}, {total_bytes / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())